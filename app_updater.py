@@ -0,0 +1,393 @@
+import hashlib
+import json
+import lzma
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+
+# Standard library only up here: skating_quiz imports this module to swap in a staged update
+# before the rest of the app (and the GUI toolkit) is loaded. App modules are imported where used.
+
+# Delta updates of the installed (PyInstaller) app, instead of re-downloading the whole release zip.
+#
+# Mirror layout (produced by tools/build_update.py):
+#     <base_url>/latest.json                 {"format": 1, "version": "v1.3.0", "manifest": "v1.3.0/manifest.json"}
+#     <base_url>/<version>/manifest.json
+#     <base_url>/files/<sha256>              lzma-compressed full file
+#     <base_url>/patches/<old>-<new>         binary patch from one file version to the next
+#
+# manifest.json:
+#     {"format": 1, "version": "v1.3.0",
+#      "files": {"_internal/base_library.zip": {
+#          "sha256": "<hash>", "size": 123, "blob_size": 45,
+#          "patches": {"<sha256 in the previous release>": {"size": 6}}}, ...}}
+#
+# Paths are relative to the install folder. A copy of the manifest ships in the install folder as
+# app_files.json, so a client knows which files a new release dropped.
+#
+# The client (a background thread) hashes its installed files, skips the unchanged ones, and for
+# each changed file downloads the patch from its current version if there is one, else the full
+# file. Every result is verified against the manifest hash and written to a staging folder; only
+# when all of them are there is pending.json written. The swap itself runs when the app closes (or
+# at the next start if it didn't get to, before anything else is imported, and the app then
+# restarts on the new files): installed files are renamed to *.old, which Windows allows even for
+# the running exe and loaded DLLs, and the staged files are moved into place.
+
+LATEST_NAME = "latest.json"
+FILES_DIR = "files"
+PATCHES_DIR = "patches"
+UPDATE_FORMAT = 1
+INSTALLED_MANIFEST = "app_files.json"
+PENDING_NAME = "pending.json"
+OLD_SUFFIX = ".old"
+OLD_FILES_NAME = "old_files.json"   # backups that were in use when the update was applied
+PATCH_BLOCK = 32
+
+_PATCH_MAGIC = b"SQDP"
+_PATCH_HEADER = struct.Struct("<4sQ")   # magic, size of the patched file
+_COPY = struct.Struct("<BQQ")           # 0, offset in the old file, length
+_INSERT = struct.Struct("<BQ")          # 1, length; followed by the bytes
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def install_dir() -> Path | None:
+    # Folder of the frozen app; None when running from source (updates come from git then).
+    if not getattr(sys, "frozen", False):
+        return None
+    return Path(sys.executable).resolve().parent
+
+
+def staging_dir() -> Path:
+    from data_pack_updater import user_data_dir
+    return user_data_dir() / "app_update"
+
+
+# --- binary patches ---
+
+def make_patch(old: bytes, new: bytes, block: int = PATCH_BLOCK) -> bytes:
+    # Copy/insert patch: runs of new that also occur in old become copies, the rest is inserted
+    # verbatim; the op stream is then lzma-compressed. Old is indexed by aligned blocks and new is
+    # scanned at every offset, so shifted data (e.g. a module that grew inside an archive) is still
+    # found. Build-time only.
+    index: dict[bytes, int] = {}
+    for i in range(0, len(old) - block + 1, block):
+        index.setdefault(old[i:i + block], i)
+
+    ops = []
+    literal_start = pos = 0
+    n, m = len(new), len(old)
+    while pos + block <= n:
+        off = index.get(new[pos:pos + block])
+        if off is None:
+            pos += 1
+            continue
+        start, old_start = pos, off
+        while start > literal_start and old_start > 0 and new[start - 1] == old[old_start - 1]:
+            start -= 1
+            old_start -= 1
+        end, old_end = pos + block, off + block
+        while end + 4096 <= n and old_end + 4096 <= m and new[end:end + 4096] == old[old_end:old_end + 4096]:
+            end += 4096
+            old_end += 4096
+        while end < n and old_end < m and new[end] == old[old_end]:
+            end += 1
+            old_end += 1
+        if start > literal_start:
+            ops.append(_INSERT.pack(1, start - literal_start) + new[literal_start:start])
+        ops.append(_COPY.pack(0, old_start, end - start))
+        pos = literal_start = end
+    if literal_start < n:
+        ops.append(_INSERT.pack(1, n - literal_start) + new[literal_start:])
+    return _PATCH_HEADER.pack(_PATCH_MAGIC, n) + lzma.compress(b"".join(ops))
+
+
+def apply_patch(old: bytes, patch: bytes) -> bytes:
+    magic, size = _PATCH_HEADER.unpack_from(patch)
+    if magic != _PATCH_MAGIC:
+        raise ValueError("Not an update patch")
+    ops = lzma.decompress(patch[_PATCH_HEADER.size:])
+    out = bytearray()
+    pos = 0
+    while pos < len(ops):
+        if ops[pos] == 0:
+            _, offset, length = _COPY.unpack_from(ops, pos)
+            pos += _COPY.size
+            if offset + length > len(old):
+                raise ValueError("Patch does not fit the installed file")
+            out += old[offset:offset + length]
+        else:
+            _, length = _INSERT.unpack_from(ops, pos)
+            pos += _INSERT.size
+            out += ops[pos:pos + length]
+            pos += length
+    if len(out) != size:
+        raise ValueError("Patched file has the wrong size")
+    return bytes(out)
+
+
+# --- client ---
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    with open(tmp, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _checked_path(base: Path, rel: str) -> Path:
+    # Manifest paths must stay inside the install/staging folder.
+    parts = Path(rel).parts
+    if not parts or Path(rel).is_absolute() or ".." in parts or Path(rel).drive:
+        raise ValueError(f"Invalid path in update manifest: {rel!r}")
+    return base / rel
+
+
+def _file_sha256(path: Path) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, "sha256").hexdigest()
+    except OSError:
+        return None
+
+
+class AppUpdater:
+    def __init__(self, base_url: str, app_dir: Path, stage_dir: Path | None = None, timeout: float = 30):
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.app_dir = Path(app_dir)
+        self.stage_dir = Path(stage_dir) if stage_dir is not None else staging_dir()
+        self.timeout = timeout
+        self.bytes_downloaded = 0
+
+    def _fetch(self, rel_url: str) -> bytes:
+        req = Request(urljoin(self.base_url, rel_url), headers={"User-Agent": "isu-quiz-app-update"})
+        with urlopen(req, timeout=self.timeout) as r:
+            data = r.read()
+        self.bytes_downloaded += len(data)
+        return data
+
+    def _fetch_json(self, rel_url: str) -> dict:
+        data = json.loads(self._fetch(rel_url).decode("utf-8"))
+        if data.get("format") != UPDATE_FORMAT:
+            raise ValueError(f"Unsupported app update format: {data.get('format')}")
+        return data
+
+    def latest(self, current_version: str) -> dict | None:
+        # The newer release's manifest, or None when current_version is up to date.
+        from version_update_checker import _parse_semantic_version
+        latest = self._fetch_json(LATEST_NAME)
+        newer, current = _parse_semantic_version(latest["version"]), _parse_semantic_version(current_version)
+        if not newer or not current or newer <= current:
+            return None
+        return self._fetch_json(latest["manifest"])
+
+    def _installed_files(self) -> set[str]:
+        try:
+            with open(self.app_dir / INSTALLED_MANIFEST, encoding="utf-8") as f:
+                return set(json.load(f).get("files", {}))
+        except (OSError, ValueError):
+            return set()
+
+    def stage(self, manifest: dict) -> dict:
+        # Downloads and verifies every changed file into the staging folder, then writes
+        # pending.json. Returns the pending update ({"version", "files", "removed"}).
+        version = manifest["version"]
+        files_dir = self.stage_dir / version
+        pending = self.stage_dir / PENDING_NAME
+        if pending.exists():
+            pending.unlink()
+        if self.stage_dir.is_dir():
+            # An older release staged but never installed gets replaced.
+            for child in self.stage_dir.iterdir():
+                if child.is_dir() and child.name != version:
+                    shutil.rmtree(child, ignore_errors=True)
+
+        changed: dict[str, str] = {}
+        for rel, entry in manifest["files"].items():
+            digest = entry["sha256"]
+            if _file_sha256(_checked_path(self.app_dir, rel)) == digest:
+                continue
+            changed[rel] = digest
+            staged = _checked_path(files_dir, rel)
+            if _file_sha256(staged) == digest:
+                continue   # left over from an interrupted download
+            _write_atomic(staged, self._fetch_file(rel, entry))
+
+        manifest_bytes = json.dumps(manifest, indent=2).encode("utf-8")
+        _write_atomic(files_dir / INSTALLED_MANIFEST, manifest_bytes)
+        changed[INSTALLED_MANIFEST] = sha256_hex(manifest_bytes)
+
+        update = {
+            "version": version,
+            "files": changed,
+            "removed": sorted(self._installed_files() - set(manifest["files"])),
+        }
+        _write_atomic(pending, json.dumps(update, indent=2).encode("utf-8"))
+        return update
+
+    def _fetch_file(self, rel: str, entry: dict) -> bytes:
+        digest = entry["sha256"]
+        local = self.app_dir / rel
+        local_digest = _file_sha256(local)
+        if local_digest is not None and local_digest in entry.get("patches", {}):
+            try:
+                data = apply_patch(local.read_bytes(), self._fetch(f"{PATCHES_DIR}/{local_digest}-{digest}"))
+                if sha256_hex(data) == digest:
+                    return data
+            except Exception as e:
+                print(f"Patch for {rel} failed, downloading the whole file: {e}")
+        data = lzma.decompress(self._fetch(f"{FILES_DIR}/{digest}"))
+        if sha256_hex(data) != digest:
+            raise ValueError(f"{rel} failed hash verification")
+        return data
+
+
+def apply_staged_update(app_dir: Path, stage_dir: Path | None = None) -> str | None:
+    # Swaps a fully staged update into app_dir. Returns the installed version, or None when there
+    # was nothing to do or the swap had to be rolled back (it's retried next time).
+    stage_dir = Path(stage_dir) if stage_dir is not None else staging_dir()
+    pending_path = stage_dir / PENDING_NAME
+    try:
+        with open(pending_path, encoding="utf-8") as f:
+            update = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    files_dir = _checked_path(stage_dir, update["version"])
+    for rel, digest in update["files"].items():
+        if _file_sha256(_checked_path(files_dir, rel)) != digest:
+            print(f"Staged update is incomplete ({rel}); discarding it")
+            shutil.rmtree(stage_dir, ignore_errors=True)
+            return None
+
+    # (installed path, its .old backup, whether the staged file was moved in) for rollback
+    moved: list[tuple[Path, Path | None, bool]] = []
+    try:
+        for rel in [*update["files"], *update["removed"]]:
+            dst = _checked_path(app_dir, rel)
+            backup = None
+            if dst.exists():
+                backup = dst.with_name(dst.name + OLD_SUFFIX)
+                if backup.exists():
+                    backup.unlink()
+                os.replace(dst, backup)
+            moved.append((dst, backup, False))
+            if rel in update["files"]:
+                dst.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(files_dir / rel, dst)
+                moved[-1] = (dst, backup, True)
+    except OSError as e:
+        print(f"Could not install update {update['version']}, will retry: {e}")
+        for dst, backup, installed in reversed(moved):
+            # Files new in this release go back to staging too, not only the replaced ones.
+            if installed:
+                os.replace(dst, files_dir / dst.relative_to(app_dir))
+            if backup is not None:
+                os.replace(backup, dst)
+        return None
+
+    shutil.rmtree(stage_dir, ignore_errors=True)
+    remove_old_files([backup for _, backup, _ in moved if backup is not None], stage_dir)
+    return update["version"]
+
+
+def remove_old_files(backups: list[Path], stage_dir: Path | None = None) -> None:
+    # Backups of replaced files. The ones still in use by the running process (the exe on
+    # Windows) are remembered in the staging folder and go next time.
+    stage_dir = Path(stage_dir) if stage_dir is not None else staging_dir()
+    left = []
+    for path in backups:
+        try:
+            path.unlink(missing_ok=True)
+        except OSError:
+            left.append(str(path))
+    old_list = stage_dir / OLD_FILES_NAME
+    if left:
+        _write_atomic(old_list, json.dumps(left, indent=2).encode("utf-8"))
+    elif old_list.exists():
+        old_list.unlink()
+
+
+def _remembered_old_files(stage_dir: Path) -> list[Path]:
+    try:
+        with open(stage_dir / OLD_FILES_NAME, encoding="utf-8") as f:
+            return [Path(p) for p in json.load(f)]
+    except (OSError, ValueError):
+        return []
+
+
+def finish_pending_update(relaunch: bool = False) -> None:
+    # Called before the app imports anything else (relaunch=True) and after it exits.
+    app_dir = install_dir()
+    if app_dir is None:
+        return
+    stage_dir = staging_dir()
+    remove_old_files(_remembered_old_files(stage_dir), stage_dir)
+    if apply_staged_update(app_dir, stage_dir) is not None and relaunch:
+        _relaunch()
+
+
+def _relaunch() -> None:
+    # This process was started from the files that were just replaced, and PyInstaller reads
+    # modules from its archive as they are first imported (the quiz screens are imported lazily),
+    # so carry on in a fresh process on the new files.
+    env = dict(os.environ, PYINSTALLER_RESET_ENVIRONMENT="1")
+    subprocess.Popen([sys.executable, *sys.argv[1:]], env=env)
+    sys.exit(0)
+
+
+def stage_app_update_async(root, base_url: str, current_version: str, delay_ms: int = 500) -> None:
+    # Starts a background download of the next release; tells the user once it's staged.
+    # Fail-silent, like the version check.
+    app_dir = install_dir()
+    if app_dir is None:
+        return
+
+    def start_worker() -> None:
+        def worker() -> None:
+            updater = AppUpdater(base_url, app_dir)
+            try:
+                manifest = updater.latest(current_version)
+                if manifest is None:
+                    return
+                update = updater.stage(manifest)
+            except Exception as e:
+                print(f"App update failed: {e}")
+                return
+            try:
+                root.after(0, lambda: _show_staged_window(root, update["version"], updater.bytes_downloaded))
+            except Exception:
+                return
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    try:
+        root.after(delay_ms, start_worker)
+    except Exception:
+        return
+
+
+def _show_staged_window(root, version: str, downloaded: int) -> None:
+    import customtkinter as ctk
+    win = ctk.CTkToplevel(root)
+    win.title("Skating Quiz Update")
+    win.transient(root)
+    win.resizable(False, False)
+
+    container = ctk.CTkFrame(win)
+    container.pack(fill="both", expand=True, padx=14, pady=12)
+    msg = (f"Version {version} has been downloaded ({downloaded / 1024:.0f} KB).\n\n"
+           "It will be installed when you close the app.")
+    ctk.CTkLabel(container, text=msg, justify="left").pack(anchor="w")
+    ctk.CTkButton(container, text="OK", command=win.destroy).pack(anchor="e", pady=(12, 0))
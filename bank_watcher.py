@@ -0,0 +1,112 @@
+import os
+import threading
+from typing import Callable, Dict, Optional, Set, Tuple
+
+# Watch mode for content editors (SKATING_QUIZ_WATCH=1 or --watch): edits to a loaded bank CSV
+# show up in the running app without a restart.
+#
+# Every interval the Tk loop stats each loaded bank file (mtime + size, a few microseconds per
+# file). Only when that changes is the file re-parsed, on a worker thread; back on the UI thread
+# the result is diffed per category against the loaded data and just the changed categories are
+# swapped in, then on_changed({bank: {categories}}) lets the open screen refresh.
+#
+# Banks that failed to load are watched too: once their file changes they are loaded again, and
+# on_changed reports all their categories (on_status(bank) is called either way, for the menu).
+# The baseline for both is the signature the registry took when it read the file.
+#
+# Polling rather than inotify: the standard library has no file notification API and a handful
+# of stat() calls per second is cheaper than an extra (platform-specific) dependency.
+
+POLL_INTERVAL_MS = 1000
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class BankWatcher:
+    def __init__(self, root, registry, on_changed: Callable[[Dict[str, Set[str]]], None],
+                 on_status: Optional[Callable[[str], None]] = None, interval_ms: int = POLL_INTERVAL_MS):
+        self.root = root
+        self.registry = registry
+        self.on_changed = on_changed
+        self.on_status = on_status
+        self.interval_ms = interval_ms
+        self._signatures: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._busy: Set[str] = set()     # banks being re-parsed or retried right now
+        self._after_id: Optional[str] = None
+
+    def start(self) -> None:
+        if self._after_id is None:
+            self._after_id = self.root.after(self.interval_ms, self.poll)
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def poll(self) -> None:
+        loaded = self.registry.loaded_banks()
+        # Evicted banks start over from the registry's signature if they're loaded again.
+        self._signatures = {bank: sig for bank, sig in self._signatures.items() if bank in loaded}
+        for bank, loader in loaded.items():
+            if bank in self._busy:
+                continue
+            sig = file_signature(loader.filename)
+            if bank not in self._signatures:
+                source = self.registry.bank_source(bank)
+                self._signatures[bank] = source[1] if source is not None and source[0] == loader.filename else sig
+            if sig is None or sig == self._signatures[bank]:
+                continue
+            self._signatures[bank] = sig
+            self._busy.add(bank)
+            threading.Thread(target=self._reparse, args=(bank, loader), daemon=True).start()
+
+        for bank, (path, known) in self.registry.failed_banks().items():
+            if bank in self._busy or file_signature(path) == known:
+                continue
+            self._busy.add(bank)
+            threading.Thread(target=self._retry, args=(bank,), daemon=True).start()
+        self._after_id = self.root.after(self.interval_ms, self.poll)
+
+    def _reparse(self, bank: str, loader) -> None:
+        try:
+            parsed = loader.read_categories()
+        except Exception as e:
+            # Usually a half-saved file or a category that doesn't validate; keep the loaded data.
+            print(f"Reload of {bank} failed: {e}")
+            parsed = None
+        try:
+            self.root.after(0, lambda: self._apply(bank, loader, parsed))
+        except Exception:
+            return
+
+    def _retry(self, bank: str) -> None:
+        loader = self.registry.retry_failed_bank(bank)
+        try:
+            self.root.after(0, lambda: self._retried(bank, loader))
+        except Exception:
+            return
+
+    def _retried(self, bank: str, loader) -> None:
+        self._busy.discard(bank)
+        if loader is not None:
+            self.on_changed({bank: set(loader.get_categories())})
+        if self.on_status is not None:
+            self.on_status(bank)
+
+    def _apply(self, bank: str, loader, parsed) -> None:
+        self._busy.discard(bank)
+        if parsed is None:
+            return
+        changed = loader.changed_categories(parsed)
+        if changed:
+            loader.apply_categories(parsed, changed)
+            self.on_changed({bank: changed})
@@ -0,0 +1,264 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from urllib.parse import urljoin
+from urllib.request import Request, urlopen
+
+from version_update_checker import _parse_semantic_version
+
+# Incremental, content-addressed sync of quiz_data/*.csv from a mirror.
+#
+# Mirror layout (produced by tools/build_data_pack.py):
+#     <base_url>/manifest.json
+#     <base_url>/chunks/<sha256>
+#
+# manifest.json:
+#     {"format": 1,
+#      "banks": {"quiz_data/pair-skating-minus.csv": {
+#          "sha256": "<hash of the whole file>",
+#          "chunks": [{"category": "LIFTS", "sha256": "...", "size": 123}, ...]}}}
+#
+# A chunk is the raw bytes of a run of consecutive CSV lines of one category (the header line is
+# its own chunk; a category whose lines are split up in the file has one chunk per run). A bank
+# file is exactly the concatenation of its chunks in manifest order, so only chunks whose hash
+# is not already present locally have to be downloaded.
+#
+# Synced copies take precedence over the bundled banks, so sync_state.json records the app version
+# they were synced under; after an app update (which ships its own, newer banks) they are dropped.
+
+MANIFEST_NAME = "manifest.json"
+CHUNKS_DIR = "chunks"
+MANIFEST_FORMAT = 1
+SYNC_STATE_NAME = "sync_state.json"
+
+def _bundled_path(relative_path: str) -> str:
+    try:
+        base_path = sys._MEIPASS  # type: ignore[attr-defined]
+    except Exception:
+        base_path = os.path.abspath(".")
+    return os.path.join(base_path, relative_path)
+
+
+def user_data_dir() -> Path:
+    # Writable location for synced packs (the PyInstaller bundle is read-only in practice).
+    override = os.environ.get("SKATING_QUIZ_DATA_DIR")
+    if override:
+        return Path(override)
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".local", "share")
+    return Path(base) / "skating_quiz"
+
+
+def data_file_path(relative_path: str) -> str:
+    # Synced copy if one exists, otherwise the bundled file.
+    synced = user_data_dir() / relative_path
+    if synced.is_file():
+        return str(synced)
+    return _bundled_path(relative_path)
+
+
+def discard_stale_packs(app_version: str, data_dir: Path | None = None) -> list[str]:
+    # Removes synced banks that were synced by an older app than this one (or by an app that didn't
+    # tag them), so the bundled banks of this release are used again. Returns the removed banks.
+    data_dir = Path(data_dir) if data_dir is not None else user_data_dir()
+    try:
+        with open(data_dir / SYNC_STATE_NAME, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+
+    if state is not None:
+        synced, current = _parse_semantic_version(state.get("app_version", "")), _parse_semantic_version(app_version)
+        stale = current > synced if synced and current else state.get("app_version") != app_version
+        if not stale:
+            return []
+        banks = list(state.get("banks", []))
+    else:
+        banks = [p.relative_to(data_dir).as_posix() for p in (data_dir / "quiz_data").rglob("*.csv")]
+
+    removed = []
+    for bank in banks:
+        try:
+            (data_dir / bank).unlink()
+            removed.append(bank)
+        except OSError:
+            pass
+    try:
+        (data_dir / SYNC_STATE_NAME).unlink()
+    except OSError:
+        pass
+    return removed
+
+
+def sha256_hex(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _row_category(line: bytes) -> str:
+    return line.split(b";", 1)[0].strip().decode("cp1252", errors="replace")
+
+
+def split_chunks(data: bytes) -> list[tuple[str, bytes]]:
+    # Runs of consecutive lines of the same category, in file order.
+    # Returns [(category, chunk_bytes), ...]; concatenating the chunks always gives back the file.
+    runs: list[tuple[str, list[bytes]]] = []
+    for line in data.splitlines(keepends=True):
+        cat = _row_category(line)
+        if not runs or runs[-1][0] != cat:
+            runs.append((cat, []))
+        runs[-1][1].append(line)
+    return [(cat, b"".join(lines)) for cat, lines in runs]
+
+
+def _chunks_by_category(chunks: list[tuple[str, str]]) -> dict[str, list[str]]:
+    # [(category, chunk hash), ...] -> {category: [its chunk hashes in file order]}
+    by_cat: dict[str, list[str]] = {}
+    for cat, digest in chunks:
+        by_cat.setdefault(cat, []).append(digest)
+    return by_cat
+
+
+def build_bank_manifest(data: bytes) -> tuple[dict, dict[str, bytes]]:
+    # Returns (manifest entry for one bank, {sha256: chunk_bytes}).
+    chunks = split_chunks(data)
+    blobs = {sha256_hex(blob): blob for _, blob in chunks}
+    entry = {
+        "sha256": sha256_hex(data),
+        "chunks": [{"category": cat, "sha256": sha256_hex(blob), "size": len(blob)} for cat, blob in chunks],
+    }
+    return entry, blobs
+
+
+class DataPackUpdater:
+    def __init__(self, base_url: str, banks: list[str], data_dir: Path | None = None, timeout: float = 10,
+                 app_version: str = ""):
+        # banks: paths relative to the bundled resources / the local data dir, e.g. "quiz_data/x.csv".
+        self.base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.data_dir = Path(data_dir) if data_dir is not None else user_data_dir()
+        self.banks = list(banks)
+        self.app_version = app_version   # tag for the synced copies, see discard_stale_packs()
+        self.timeout = timeout
+        self.bytes_downloaded = 0
+
+    # --- network ---
+
+    def _fetch(self, rel_url: str) -> bytes:
+        req = Request(urljoin(self.base_url, rel_url), headers={"User-Agent": "isu-quiz-data-sync"})
+        with urlopen(req, timeout=self.timeout) as r:
+            data = r.read()
+        self.bytes_downloaded += len(data)
+        return data
+
+    def fetch_manifest(self) -> dict:
+        manifest = json.loads(self._fetch(MANIFEST_NAME).decode("utf-8"))
+        if manifest.get("format") != MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported data pack manifest format: {manifest.get('format')}")
+        return manifest
+
+    def _fetch_chunk(self, digest: str) -> bytes:
+        blob = self._fetch(f"{CHUNKS_DIR}/{digest}")
+        if sha256_hex(blob) != digest:
+            raise ValueError(f"Chunk {digest} failed hash verification")
+        return blob
+
+    # --- local state ---
+
+    def _local_bank_bytes(self, bank: str) -> bytes | None:
+        synced = self.data_dir / bank
+        path = str(synced) if synced.is_file() else _bundled_path(bank)
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_atomic(self, path: Path, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".part")
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def _tag_synced(self, bank: str) -> None:
+        path = self.data_dir / SYNC_STATE_NAME
+        try:
+            with open(path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        banks = set(state.get("banks", [])) | {bank}
+        state = {"app_version": self.app_version, "banks": sorted(banks)}
+        self._write_atomic(path, json.dumps(state, indent=2).encode("utf-8"))
+
+    # --- sync ---
+
+    def sync(self) -> dict[str, set[str]]:
+        # Bring every known bank up to date with the mirror.
+        # Returns {bank: {changed categories}} for banks that actually changed.
+        manifest = self.fetch_manifest()
+        changed: dict[str, set[str]] = {}
+
+        for bank in self.banks:
+            remote = manifest.get("banks", {}).get(bank)
+            if not remote:
+                continue
+
+            local_data = self._local_bank_bytes(bank)
+            if local_data is not None and sha256_hex(local_data) == remote["sha256"]:
+                continue
+
+            # Everything we already have locally is addressable by hash.
+            local_chunks = split_chunks(local_data) if local_data is not None else []
+            available = {sha256_hex(blob): blob for _, blob in local_chunks}
+            local_by_cat = _chunks_by_category([(cat, sha256_hex(blob)) for cat, blob in local_chunks])
+
+            parts = []
+            for chunk in remote["chunks"]:
+                digest = chunk["sha256"]
+                if digest not in available:
+                    available[digest] = self._fetch_chunk(digest)
+                parts.append(available[digest])
+
+            new_data = b"".join(parts)
+            if sha256_hex(new_data) != remote["sha256"]:
+                raise ValueError(f"Assembled bank {bank} failed hash verification")
+
+            self._write_atomic(self.data_dir / bank, new_data)
+            self._tag_synced(bank)
+
+            remote_by_cat = _chunks_by_category([(c["category"], c["sha256"]) for c in remote["chunks"]])
+            cats = {cat for cat in set(local_by_cat) | set(remote_by_cat)
+                    if local_by_cat.get(cat) != remote_by_cat.get(cat)}
+            changed[bank] = cats
+
+        return changed
+
+
+def sync_data_packs_async(root, base_url: str, banks: list[str], on_updated, delay_ms: int = 500,
+                          app_version: str = "") -> None:
+    # Starts a background sync - calls on_updated({bank: {categories}}) on the UI thread
+    # if anything changed. Fail-silent, like the version check.
+    def start_worker() -> None:
+        def worker() -> None:
+            try:
+                changed = DataPackUpdater(base_url, banks, app_version=app_version).sync()
+            except Exception as e:
+                print(f"Data pack sync failed: {e}")
+                return
+            if not changed:
+                return
+            try:
+                root.after(0, lambda: on_updated(changed))
+            except Exception:
+                return
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    try:
+        root.after(delay_ms, start_worker)
+    except Exception:
+        return
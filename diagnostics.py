@@ -0,0 +1,159 @@
+import gc
+import time
+import tracemalloc
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional
+
+# Long-session memory / widget-leak tracker.
+#
+# Enabled with SKATING_QUIZ_DIAGNOSTICS=1 (or --diagnostics). It samples:
+#   - tracemalloc traced memory
+#   - number of live Tk widgets (winfo_children, recursively)
+#   - Python object counts by type (top N)
+# periodically and on every screen transition, and flags metrics that only ever grow
+# across the last few transitions.
+
+
+@dataclass
+class MemorySample:
+    timestamp: float
+    label: str                 # "periodic" or the screen that was just shown
+    traced_bytes: int
+    peak_bytes: int
+    widget_count: int
+    object_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def count_widgets(root) -> int:
+    # Includes root itself. CTk widgets are frames/canvases underneath, so this counts real Tk widgets.
+    total = 0
+    stack = [root]
+    while stack:
+        w = stack.pop()
+        total += 1
+        try:
+            stack.extend(w.winfo_children())
+        except Exception:
+            pass
+    return total
+
+
+def count_objects_by_type(top_n: int = 25) -> Dict[str, int]:
+    counts = Counter(type(o).__name__ for o in gc.get_objects())
+    return dict(counts.most_common(top_n))
+
+
+def is_monotonic_growth(values: List[int], min_increase: int = 1) -> bool:
+    # True when every step grows and the total growth is at least min_increase.
+    if len(values) < 2:
+        return False
+    if any(b <= a for a, b in zip(values, values[1:])):
+        return False
+    return values[-1] - values[0] >= min_increase
+
+
+class LeakTracker:
+    # How many transition samples a metric must keep growing across before it's flagged.
+    GROWTH_WINDOW = 6
+    # Ignore tiny allocator noise in traced memory.
+    MIN_BYTES_GROWTH = 64 * 1024
+    # Object types reported when growing.
+    OBJECT_TOP_N = 25
+    # Bounded history, so the tracker itself doesn't show up as a leak in all-day sessions.
+    MAX_SAMPLES = 500
+
+    def __init__(self, root, interval_ms: int = 30_000, report=print, max_samples: int = MAX_SAMPLES):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.report = report
+        self.samples: Deque[MemorySample] = deque(maxlen=max_samples)
+        self.transition_samples: Deque[MemorySample] = deque(maxlen=max_samples)
+        self.warnings: List[str] = []
+        self._after_id: Optional[str] = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.sample("start")
+        self._schedule()
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+
+    def _schedule(self) -> None:
+        try:
+            self._after_id = self.root.after(self.interval_ms, self._tick)
+        except Exception:
+            self._after_id = None
+
+    def _tick(self) -> None:
+        self.sample("periodic")
+        self._schedule()
+
+    def sample(self, label: str) -> MemorySample:
+        gc.collect()
+        traced, peak = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+        s = MemorySample(
+            timestamp=time.time(),
+            label=label,
+            traced_bytes=traced,
+            peak_bytes=peak,
+            widget_count=count_widgets(self.root),
+            object_counts=count_objects_by_type(self.OBJECT_TOP_N),
+        )
+        self.samples.append(s)
+        return s
+
+    def on_transition(self, screen_name: str) -> None:
+        # Called after a screen has been swapped in. Screens are rebuilt from scratch,
+        # so at a steady state the same screen should always land on the same counts.
+        s = self.sample(screen_name)
+        self.transition_samples.append(s)
+        for msg in self.check_growth():
+            if msg not in self.warnings:
+                self.warnings.append(msg)
+                self.report(f"[diagnostics] {msg}")
+
+    def check_growth(self) -> List[str]:
+        # Compare like with like: only transitions into the same screen as the latest one.
+        if not self.transition_samples:
+            return []
+        label = self.transition_samples[-1].label
+        window = [s for s in self.transition_samples if s.label == label][-self.GROWTH_WINDOW:]
+        if len(window) < self.GROWTH_WINDOW:
+            return []
+
+        out = []
+        widgets = [s.widget_count for s in window]
+        if is_monotonic_growth(widgets):
+            out.append(f"{label}: Tk widget count grew on every transition: {widgets[0]} -> {widgets[-1]}")
+
+        traced = [s.traced_bytes for s in window]
+        if is_monotonic_growth(traced, self.MIN_BYTES_GROWTH):
+            out.append(f"{label}: traced memory grew on every transition: "
+                       f"{traced[0] / 1024:.0f} KiB -> {traced[-1] / 1024:.0f} KiB")
+
+        for type_name in window[-1].object_counts:
+            counts = [s.object_counts.get(type_name, 0) for s in window]
+            if is_monotonic_growth(counts, self.GROWTH_WINDOW):
+                out.append(f"{label}: '{type_name}' objects grew on every transition: {counts[0]} -> {counts[-1]}")
+        return out
+
+    def summary(self) -> str:
+        if not self.samples:
+            return "No samples."
+        first, last = self.samples[0], self.samples[-1]
+        lines = [
+            f"Samples: {len(self.samples)} ({len(self.transition_samples)} transitions)",
+            f"Traced memory: {first.traced_bytes / 1024:.0f} KiB -> {last.traced_bytes / 1024:.0f} KiB "
+            f"(peak {last.peak_bytes / 1024:.0f} KiB)",
+            f"Tk widgets: {first.widget_count} -> {last.widget_count}",
+        ]
+        lines.extend(f"Warning: {w}" for w in self.warnings)
+        return "\n".join(lines)
@@ -0,0 +1,367 @@
+import importlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from bank_watcher import file_signature
+from data_pack_updater import data_file_path
+from languages import DEFAULT_LANGUAGE, forget_language, localized_path
+
+# (discipline, mode) -> data bank + loader + screen, discovered from quiz_data/disciplines.json.
+#
+# Nothing is imported or parsed up front: the loader/screen modules named in the manifest are
+# imported, and the bank file is loaded, when a route is first opened or when preload_async()
+# gets to it in the background. Loaded banks (and load errors) are cached for the rest of the
+# session (a failed bank is retried when its file changes, see bank_watcher.py); the cache is
+# shared between the UI thread and the preload workers.
+#
+# Banks are per language (see languages.py): only the selected language's banks are loaded, and
+# a language's banks and match indexes are evicted once it hasn't been selected for a while.
+# A route whose bank has no translation is simply not offered in that language.
+#
+# Manifest:
+#     {"modes": [{"id": "penalties", "label": "penalties",
+#                 "loader": "quiz_penalties:QuizLoader", "screen": "quiz_penalties:PenaltiesQuizScreen"}, ...],
+#      "disciplines": [{"id": "pair", "label": "Pair skating",
+#                       "banks": {"penalties": "quiz_data/pair-skating-minus.csv", ...}}, ...],
+#      "languages": [{"id": "en", "label": "English"}, {"id": "fi", "label": "Suomi"}]}
+#
+# "combined" routes use every bank of one or more modes (one menu button each, below the grid):
+#     "combined": [{"id": "search", "label": "Search penalties and GOE bullets",
+#                   "banks": {"penalty_loaders": "penalties", "recall_loaders": "recall"},
+#                   "index": "quiz_search:SearchIndex", "screen": "quiz_search:SearchScreen"}]
+# "banks" maps a screen argument to a mode; it gets {discipline: loader} for every bank of that mode
+# that loads. The index is built with Index.from_loaders(**those, language=...) and kept per
+# language (see cached_index), then the screen is called as
+# Screen(master, on_back=..., language=..., index=..., **those). start_route(..., <id>) opens it.
+#
+# A bank can also be an object {"data": ..., "loader": ..., "screen": ...} to override the mode defaults.
+# Any other keys of that object are passed to the screen as keyword arguments, e.g. mock exam
+# category weights for a penalties bank: {"data": ..., "weights": {"Lifts": 3, "Falls": 1}}.
+
+MANIFEST_PATH = "quiz_data/disciplines.json"
+
+# Bank states, see DisciplineRegistry.bank_status()
+BANK_PENDING = "pending"
+BANK_READY = "ready"
+BANK_FAILED = "error"
+
+PRELOAD_WORKERS = 4
+
+# Languages whose banks stay loaded (the selected one plus the most recently used others).
+MAX_LOADED_LANGUAGES = 2
+
+
+@dataclass(frozen=True)
+class Discipline:
+    id: str
+    label: str
+
+
+@dataclass(frozen=True)
+class Mode:
+    id: str
+    label: str
+
+
+@dataclass(frozen=True)
+class Language:
+    id: str
+    label: str
+
+
+@dataclass(frozen=True)
+class RouteSpec:
+    discipline: str
+    mode: str
+    label: str      # menu text, e.g. "Pair skating penalties"
+    data: str       # bank path relative to the resources / synced data dir (default language)
+    loader: str     # "module:Class", called with the resolved bank file path and language=
+    screen: str     # "module:Class", called as Screen(master, loader=..., on_back=..., **options)
+    options: Dict[str, Any] = field(default_factory=dict, compare=False)   # extra keys of the bank entry
+
+
+@dataclass(frozen=True)
+class CombinedRoute:
+    id: str
+    label: str                  # menu text
+    banks: Tuple[Tuple[str, str], ...]   # (screen argument, mode)
+    index: str                  # "module:Class" with a from_loaders(**loaders, language=...) classmethod
+    screen: str                 # "module:Class"
+
+
+def resolve_symbol(ref: str) -> Any:
+    module_name, _, attr = ref.partition(":")
+    return getattr(importlib.import_module(module_name), attr)
+
+
+class BankLoadError(Exception):
+    pass
+
+
+class DisciplineRegistry:
+    def __init__(self, disciplines: List[Discipline], modes: List[Mode], routes: List[RouteSpec],
+                 languages: Optional[List[Language]] = None, combined: Optional[List[CombinedRoute]] = None):
+        self.disciplines = disciplines
+        self.modes = modes
+        self.combined = combined or []
+        self.languages = languages or [Language(DEFAULT_LANGUAGE, "English")]
+        self.language = DEFAULT_LANGUAGE
+        self._recent_languages: List[str] = [DEFAULT_LANGUAGE]   # most recent first
+        self._routes: Dict[tuple, RouteSpec] = {(r.discipline, r.mode): r for r in routes}
+        # All keyed by localized bank path (bank_key)
+        self._banks: Dict[str, Any] = {}   # -> loaded loader
+        self._errors: Dict[str, str] = {}  # -> why it could not be loaded
+        self._bank_languages: Dict[str, str] = {}
+        self._sources: Dict[str, Tuple[str, Optional[Tuple[int, int]]]] = {}  # -> (file, its signature when read)
+        self._lock = threading.Lock()      # guards the four dicts above
+        self._bank_locks: Dict[str, threading.Lock] = {}  # one load at a time per bank
+        self._translated: Dict[str, bool] = {}
+        self._indexes: Dict[Tuple[str, str], Any] = {}    # (name, language) -> search/recall index
+
+    @classmethod
+    def from_manifest(cls, path: Optional[str] = None) -> "DisciplineRegistry":
+        with open(path or data_file_path(MANIFEST_PATH), encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        modes = []
+        mode_defaults: Dict[str, dict] = {}
+        for m in manifest.get("modes", []):
+            modes.append(Mode(id=m["id"], label=m.get("label", m["id"])))
+            mode_defaults[m["id"]] = m
+
+        disciplines = []
+        routes = []
+        for d in manifest.get("disciplines", []):
+            disciplines.append(Discipline(id=d["id"], label=d.get("label", d["id"])))
+            for mode_id, bank in d.get("banks", {}).items():
+                if mode_id not in mode_defaults:
+                    raise ValueError(f"Discipline '{d['id']}' uses unknown mode '{mode_id}'")
+                bank = {"data": bank} if isinstance(bank, str) else bank
+                defaults = mode_defaults[mode_id]
+                routes.append(RouteSpec(
+                    discipline=d["id"],
+                    mode=mode_id,
+                    label=f"{d.get('label', d['id'])} {defaults.get('label', mode_id)}",
+                    data=bank["data"],
+                    loader=bank.get("loader", defaults.get("loader")),
+                    screen=bank.get("screen", defaults.get("screen")),
+                    options={k: v for k, v in bank.items() if k not in ("data", "loader", "screen")},
+                ))
+        languages = [Language(id=lang["id"], label=lang.get("label", lang["id"]))
+                     for lang in manifest.get("languages", [])]
+        if languages and DEFAULT_LANGUAGE not in {lang.id for lang in languages}:
+            raise ValueError(f"The manifest's languages must include the default language '{DEFAULT_LANGUAGE}'")
+
+        combined = []
+        for c in manifest.get("combined", []):
+            for mode_id in c["banks"].values():
+                if mode_id not in mode_defaults:
+                    raise ValueError(f"Combined route '{c['id']}' uses unknown mode '{mode_id}'")
+            combined.append(CombinedRoute(id=c["id"], label=c.get("label", c["id"]),
+                                          banks=tuple(c["banks"].items()), index=c["index"], screen=c["screen"]))
+        return cls(disciplines, modes, routes, languages, combined)
+
+    # --- routes (in the selected language) ---
+
+    def get(self, discipline: str, mode: str) -> Optional[RouteSpec]:
+        spec = self._routes.get((discipline, mode))
+        return spec if spec is not None and self.is_translated(spec) else None
+
+    def routes_for_mode(self, mode: str) -> List[RouteSpec]:
+        return [r for r in self._routes.values() if r.mode == mode and self.is_translated(r)]
+
+    def get_combined(self, route_id: str) -> Optional[CombinedRoute]:
+        return next((c for c in self.combined if c.id == route_id), None)
+
+    def combined_bank_keys(self, route: CombinedRoute) -> List[str]:
+        return [self.bank_key(r) for _, mode in route.banks for r in self.routes_for_mode(mode)]
+
+    def bank_key(self, spec: RouteSpec, language: Optional[str] = None) -> str:
+        return localized_path(spec.data, language or self.language)
+
+    def is_translated(self, spec: RouteSpec, language: Optional[str] = None) -> bool:
+        key = self.bank_key(spec, language)
+        if key == spec.data:
+            return True
+        if key not in self._translated:
+            self._translated[key] = os.path.exists(data_file_path(key))
+        return self._translated[key]
+
+    def all_data_files(self) -> List[str]:
+        # Bank files of every listed language (data packs sync translations too); a translation
+        # that doesn't exist is left out.
+        files = set()
+        for r in self._routes.values():
+            for lang in self.languages:
+                key = self.bank_key(r, lang.id)
+                if key == r.data or os.path.exists(data_file_path(key)):
+                    files.add(key)
+        return sorted(files)
+
+    def modules(self) -> List[str]:
+        # Every module the manifest refers to (PyInstaller can't see importlib imports).
+        refs = {r.loader for r in self._routes.values()} | {r.screen for r in self._routes.values()}
+        refs |= {c.index for c in self.combined} | {c.screen for c in self.combined}
+        return sorted({ref.partition(":")[0] for ref in refs})
+
+    # --- banks ---
+
+    def load_bank(self, spec: RouteSpec, language: Optional[str] = None) -> Any:
+        # Thread-safe. If another thread is already loading this bank, waits for it instead of
+        # parsing the file twice. Raises BankLoadError if the bank can't be loaded or is empty.
+        language = language or self.language
+        key = self.bank_key(spec, language)
+        with self._lock:
+            bank_lock = self._bank_locks.setdefault(key, threading.Lock())
+        with bank_lock:
+            with self._lock:
+                if key in self._banks:
+                    return self._banks[key]
+                if key in self._errors:
+                    raise BankLoadError(self._errors[key])
+                self._bank_languages[key] = language
+            # Taken before parsing, so an edit made while the file is being read still counts as a change.
+            path = data_file_path(key)
+            with self._lock:
+                self._sources[key] = (path, file_signature(path))
+            try:
+                loader = resolve_symbol(spec.loader)(path, language=language)
+                if not loader.get_categories():
+                    raise ValueError(f"no categories found in {key}")
+            except Exception as e:
+                with self._lock:
+                    self._errors[key] = f"{type(e).__name__}: {e}"
+                raise BankLoadError(self._errors[key]) from e
+            with self._lock:
+                # A preload that finishes after its language was evicted doesn't re-populate the cache.
+                if language in self._recent_languages:
+                    self._banks[key] = loader
+            return loader
+
+    def try_load_bank(self, spec: RouteSpec, language: Optional[str] = None) -> Optional[Any]:
+        try:
+            return self.load_bank(spec, language)
+        except BankLoadError:
+            return None
+
+    def loaded_bank(self, data: str) -> Optional[Any]:
+        with self._lock:
+            return self._banks.get(data)
+
+    def loaded_banks(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._banks)
+
+    def loaders_for_mode(self, mode: str) -> Dict[str, Any]:
+        # {discipline: loader} for every bank of a mode that loads; failed banks are left out.
+        loaders = {r.discipline: self.try_load_bank(r) for r in self.routes_for_mode(mode)}
+        return {d: loader for d, loader in loaders.items() if loader is not None}
+
+    def bank_source(self, data: str) -> Optional[Tuple[str, Optional[Tuple[int, int]]]]:
+        # (file, its signature when it was read) of a loaded or failed bank.
+        with self._lock:
+            return self._sources.get(data)
+
+    def failed_banks(self) -> Dict[str, Tuple[str, Optional[Tuple[int, int]]]]:
+        with self._lock:
+            return {key: self._sources[key] for key in self._errors if key in self._sources}
+
+    def retry_failed_bank(self, data: str) -> Optional[Any]:
+        # Forgets why a bank failed and loads it again (on the calling thread).
+        with self._lock:
+            language = self._bank_languages.get(data, self.language)
+            self._errors.pop(data, None)
+        spec = next((r for r in self._routes.values() if self.bank_key(r, language) == data), None)
+        return self.try_load_bank(spec, language) if spec is not None else None
+
+    def bank_status(self, data: str) -> Tuple[str, str]:
+        # (BANK_PENDING | BANK_READY | BANK_FAILED, error message)
+        with self._lock:
+            if data in self._banks:
+                return BANK_READY, ""
+            if data in self._errors:
+                return BANK_FAILED, self._errors[data]
+        return BANK_PENDING, ""
+
+    def pending_banks(self) -> List[str]:
+        # Banks of the selected language that are neither loaded nor failed yet.
+        keys = {self.bank_key(r) for r in self._routes.values() if self.is_translated(r)}
+        return sorted(k for k in keys if self.bank_status(k)[0] == BANK_PENDING)
+
+    def preload_async(self, root, on_status: Callable[[str], None], max_workers: int = PRELOAD_WORKERS) -> None:
+        # Loads every bank of the selected language in a thread pool. on_status(bank key) is
+        # called on the UI thread as each one finishes (loaded or failed).
+        language = self.language
+        specs = {self.bank_key(r): r for r in self._routes.values() if self.is_translated(r)}
+        if not specs:
+            return
+
+        def done(data: str) -> None:
+            try:
+                root.after(0, lambda: on_status(data))
+            except Exception:
+                return
+
+        def load(key: str, spec: RouteSpec) -> None:
+            self.try_load_bank(spec, language)
+            done(key)
+
+        pool = ThreadPoolExecutor(max_workers=min(max_workers, len(specs)), thread_name_prefix="preload")
+        for key, spec in specs.items():
+            pool.submit(load, key, spec)
+        pool.shutdown(wait=False)
+
+    # --- languages ---
+
+    def set_language(self, language: str) -> None:
+        self.language = language
+        if language in self._recent_languages:
+            self._recent_languages.remove(language)
+        self._recent_languages.insert(0, language)
+        for old in self._recent_languages[MAX_LOADED_LANGUAGES:]:
+            self.evict_language(old)
+        del self._recent_languages[MAX_LOADED_LANGUAGES:]
+
+    def evict_language(self, language: str) -> None:
+        # Drops a language's loaders, errors and indexes; they're rebuilt if it's selected again.
+        if language == self.language:
+            return
+        with self._lock:
+            keys = [k for k, lang in self._bank_languages.items() if lang == language]
+            for key in keys:
+                self._banks.pop(key, None)
+                self._errors.pop(key, None)
+                self._bank_languages.pop(key, None)
+                self._sources.pop(key, None)
+                self._bank_locks.pop(key, None)
+        for index_key in [k for k in self._indexes if k[1] == language]:
+            del self._indexes[index_key]
+        forget_language(language)
+
+    def cached_index(self, name: str, build: Callable[[], Any]) -> Any:
+        # Match indexes (free recall, search) are built once per language and kept with its banks.
+        key = (name, self.language)
+        if key not in self._indexes:
+            self._indexes[key] = build()
+        return self._indexes[key]
+
+    def invalidate_indexes(self, bank: str) -> None:
+        # A bank's categories changed: indexes of its language are rebuilt on next use.
+        with self._lock:
+            language = self._bank_languages.get(bank, DEFAULT_LANGUAGE)
+        for index_key in [k for k in self._indexes if k[1] == language]:
+            del self._indexes[index_key]
+
+    def create_screen(self, spec: RouteSpec, master, on_back):
+        loader = self.load_bank(spec)
+        return resolve_symbol(spec.screen)(master, loader=loader, on_back=on_back, **spec.options)
+
+    def create_combined_screen(self, route: CombinedRoute, master, on_back):
+        language = self.language
+        loaders = {arg: self.loaders_for_mode(mode) for arg, mode in route.banks}
+        index = self.cached_index(route.id, lambda: resolve_symbol(route.index).from_loaders(**loaders, language=language))
+        return resolve_symbol(route.screen)(master, on_back=on_back, language=language, index=index, **loaders)
@@ -0,0 +1,122 @@
+import json
+import os
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+from data_pack_updater import data_file_path
+from synonyms import SYNONYMS_FILE, SynonymRewriter, load_synonyms
+
+# Language packs for the quiz banks.
+#
+# English is built in and its banks live directly in quiz_data/ (as always). Any other language
+# is a directory quiz_data/<code>/ with translated bank CSVs under the same file names, plus a
+# language.json describing how to match answers in that language:
+#
+#     {"label": "Suomi",
+#      "encoding": "utf-8-sig",
+#      "plural_suffixes": [["t", "", 4], ["iden", "i", 6]],
+#      "stop_words": ["ja", "tai"]}
+#
+# A suffix rule is [suffix, replacement, min_length, unless]: tokens at least min_length long
+# ending in suffix (but not in unless) also match with the suffix replaced. An optional
+# synonyms.csv next to it expands that language's shorthand (see synonyms.py); English reads
+# quiz_data/synonyms.csv. Nothing in a pack is read until the language is first selected in the menu.
+
+DEFAULT_LANGUAGE = "en"
+LANGUAGE_FILE = "language.json"
+
+
+@dataclass(frozen=True)
+class SuffixRule:
+    suffix: str
+    replacement: str = ""
+    min_length: int = 4
+    unless: str = ""
+
+
+@dataclass(frozen=True)
+class LanguageRules:
+    code: str
+    label: str
+    encoding: str = "utf-8-sig"
+    plural_suffixes: Tuple[SuffixRule, ...] = ()
+    stop_words: FrozenSet[str] = frozenset()
+    synonyms: Optional[SynonymRewriter] = field(default=None, compare=False, repr=False)
+
+    def expand(self, text: str) -> str:
+        # Shorthand -> canonical words ("w/" -> "with"); unchanged when the language has no table.
+        return self.synonyms.rewrite(text) if self.synonyms is not None else text
+
+    def variants(self, tok: str) -> Tuple[str, ...]:
+        # The token itself plus its singular forms, e.g. bodies -> body, lifts -> lift.
+        out = [tok]
+        for rule in self.plural_suffixes:
+            if (len(tok) >= rule.min_length and tok.endswith(rule.suffix)
+                    and not (rule.unless and tok.endswith(rule.unless))):
+                out.append(tok[:len(tok) - len(rule.suffix)] + rule.replacement)
+        return tuple(dict.fromkeys(t for t in out if t))
+
+
+ENGLISH = LanguageRules(
+    code=DEFAULT_LANGUAGE,
+    label="English",
+    encoding="cp1252",   # what Windows calls "ANSI"; cp1252 exists on every platform
+    plural_suffixes=(SuffixRule("ies", "y", 5), SuffixRule("s", "", 4, "ss")),
+    stop_words=frozenset({"a", "an", "and", "at", "by", "for", "in", "is", "of", "on", "or",
+                          "the", "to", "what", "with", "s"}),
+)
+
+_loaded: Dict[str, LanguageRules] = {}
+_lock = threading.Lock()
+# Called with the language code by forget_language(), so text caches keyed by language drop it too.
+_forget_hooks: List[Callable[[str], None]] = []
+
+
+def localized_path(rel_path: str, language: str) -> str:
+    # quiz_data/pair-skating-plus.csv -> quiz_data/fi/pair-skating-plus.csv
+    if language == DEFAULT_LANGUAGE:
+        return rel_path
+    head, tail = os.path.split(rel_path)
+    return os.path.join(head, language, tail) if head else os.path.join(language, tail)
+
+
+def get_language(code: str) -> LanguageRules:
+    # Loaded on first use; a pack without language.json gets no plural rules or stop words.
+    with _lock:
+        rules = _loaded.get(code)
+    if rules is not None:
+        return rules
+
+    synonyms = load_synonyms(data_file_path(localized_path(f"quiz_data/{SYNONYMS_FILE}", code)))
+    if code == DEFAULT_LANGUAGE:
+        with _lock:
+            return _loaded.setdefault(code, replace(ENGLISH, synonyms=synonyms))
+
+    try:
+        with open(data_file_path(localized_path(f"quiz_data/{LANGUAGE_FILE}", code)), encoding="utf-8") as f:
+            raw = json.load(f)
+    except FileNotFoundError:
+        raw = {}
+    rules = LanguageRules(
+        code=code,
+        label=raw.get("label", code),
+        encoding=raw.get("encoding", "utf-8-sig"),
+        plural_suffixes=tuple(SuffixRule(*r) for r in raw.get("plural_suffixes", [])),
+        stop_words=frozenset(raw.get("stop_words", [])),
+        synonyms=synonyms,
+    )
+    with _lock:
+        return _loaded.setdefault(code, rules)
+
+
+def on_forget_language(hook: Callable[[str], None]) -> None:
+    _forget_hooks.append(hook)
+
+
+def forget_language(code: str) -> None:
+    if code != DEFAULT_LANGUAGE:
+        with _lock:
+            _loaded.pop(code, None)
+        for hook in _forget_hooks:
+            hook(code)
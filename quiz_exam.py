@@ -0,0 +1,112 @@
+import random
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from quiz_penalties import QuizLoader
+
+# Mock exams: N questions drawn across all categories, weighted per category (the bank's
+# "weights" entry in quiz_data/disciplines.json), without replacement, reproducible from a seed.
+#
+# Category picks use a precomputed alias table (O(1) per draw). Questions inside a category are
+# drawn with a sparse partial Fisher-Yates (only swapped slots are stored), also O(1) per draw
+# and independent of the category size. The alias table only has to be rebuilt when a category
+# runs out of questions, which happens at most once per category per exam.
+
+
+class AliasTable:
+    # Vose's alias method: O(n) build, O(1) sample.
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        if n == 0:
+            raise ValueError("AliasTable needs at least one weight")
+        total = float(sum(weights))
+        if total <= 0 or any(w < 0 for w in weights):
+            raise ValueError("Weights must be non-negative with a positive sum")
+
+        self.n = n
+        self.prob: List[float] = [0.0] * n
+        self.alias: List[int] = [0] * n
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            scaled[l] = scaled[l] + scaled[s] - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+
+        # Leftovers are 1.0 up to float rounding.
+        for i in large + small:
+            self.prob[i] = 1.0
+
+    def sample(self, rng: random.Random) -> int:
+        i = rng.randrange(self.n)
+        return i if rng.random() < self.prob[i] else self.alias[i]
+
+
+class ExamSampler:
+    # Precomputed sampling structure over one loaded bank.
+    #
+    # weights: {category: weight}. The chance that the next question comes from a category is
+    # proportional to its weight. Categories not listed default to their question count, so with
+    # no weights at all every question is equally likely. A weight of 0 excludes a category.
+    def __init__(self, loader: "QuizLoader", weights: Optional[Dict[str, float]] = None):
+        self.loader = loader
+        self.weights = dict(weights or {})
+        self.categories: List[str] = []
+        self.category_weights: List[float] = []
+        for cat in loader.get_categories():
+            size = len(loader.get_questions(cat))
+            w = float(self.weights.get(cat, size))
+            if size and w > 0:
+                self.categories.append(cat)
+                self.category_weights.append(w)
+        # Built once, reused for every exam until a category runs dry.
+        self.table: Optional[AliasTable] = AliasTable(self.category_weights) if self.categories else None
+
+    def max_questions(self) -> int:
+        return sum(len(self.loader.get_questions(c)) for c in self.categories)
+
+    def sample_indices(self, n: int, seed: Optional[int | str] = None) -> List[Tuple[str, int]]:
+        # Returns [(category, question_index), ...] without replacement.
+        rng = random.Random(seed)
+        n = min(n, self.max_questions())
+        if n <= 0 or self.table is None:
+            return []
+
+        active = list(range(len(self.categories)))   # positions into self.categories
+        table = self.table
+        left: Dict[int, int] = {}                      # undrawn count per touched category
+        swaps: Dict[int, Dict[int, int]] = {}          # sparse Fisher-Yates state per category
+        out: List[Tuple[str, int]] = []
+
+        while len(out) < n:
+            pos = active[table.sample(rng)]
+            cat = self.categories[pos]
+            m = left.get(pos)
+            if m is None:
+                m = len(self.loader.get_questions(cat))
+            moved = swaps.setdefault(pos, {})
+
+            # Draw slot k of the m undrawn ones, then move the last undrawn slot into its place.
+            k = rng.randrange(m)
+            out.append((cat, moved.get(k, k)))
+            moved[k] = moved.get(m - 1, m - 1)
+            m -= 1
+            left[pos] = m
+
+            if m == 0:
+                active.remove(pos)
+                if not active:
+                    break
+                table = AliasTable([self.category_weights[p] for p in active])
+
+        return out
+
+    def generate_order(self, bank, n: int, seed: Optional[int | str] = None):
+        # The exam as an array of positions into bank (the loader's current QuestionBank), ready for QuizEngine.
+        return bank.new_order(bank.category_range(cat)[idx] for cat, idx in self.sample_indices(n, seed))
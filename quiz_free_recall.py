@@ -0,0 +1,305 @@
+import heapq
+import time
+from collections import Counter
+import customtkinter as ctk
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from languages import DEFAULT_LANGUAGE, get_language
+from quiz_goe_plus_bullets import (
+    DEFAULT_SCORING,
+    RecallQuizLoader,
+    analyze,
+    similarity,
+    resource_path,
+)
+
+from session_recorder import record
+
+try:
+    from app_version import __version__
+except Exception:
+    __version__ = "0.0.0+unknown"
+
+VERSION = __version__
+WATERMARK_TEXT = f"Build: {VERSION} \t||\t Free recall (all categories)"
+
+# Same cutoff as RecallQuizScreen.on_check: below this a line is "Not close".
+MATCH_THRESHOLD = DEFAULT_SCORING.match_threshold
+
+# ----------------------------
+# Data model / index
+# ----------------------------
+
+@dataclass(frozen=True)
+class IndexedDescription:
+    # One description from one bank, addressable back to its source set.
+    bank: str         # e.g. "pair"
+    category: str
+    slot: int         # 0..5 inside the category's set
+    text: str
+    set_label: str = ""   # which set, when the category has several and the bullet isn't in all of them
+
+
+def trigrams(text: str, language: str = DEFAULT_LANGUAGE) -> Set[str]:
+    # Character trigrams of the normalized text, padded so short words still produce grams.
+    norm = analyze(text, language).norm
+    if not norm:
+        return set()
+    padded = f"  {norm} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class RecallIndex:
+    # Inverted index over every description of every loaded recall bank.
+    #
+    # Built once at load time:
+    #   - token postings (including plural variants from token_variants)
+    #   - character trigram postings (typo tolerance)
+    #
+    # lookup() uses the postings to shortlist a handful of candidates and only runs the
+    # (expensive) similarity() on that shortlist. The shortlist only walks informative
+    # postings: stop words are skipped, and so are terms found in more than
+    # MAX_POSTING_SHARE of the entries ("good", " th") once the RAREST_FALLBACK rarest
+    # terms of the query have been counted.
+    # Entries need MIN_OVERLAP to be ranked, and only the top SHORTLIST_SIZE are picked
+    # (heap, not a full sort).
+    TOKEN_WEIGHT = 3.0
+    TRIGRAM_WEIGHT = 1.0
+    SHORTLIST_SIZE = 24
+    MAX_POSTING_SHARE = 0.05
+    MIN_POSTING_CAP = 50        # small banks keep every term
+    RAREST_FALLBACK = 3         # terms kept when all of them are common
+    MIN_OVERLAP = 2.0           # a shared word, or two shared trigrams
+
+    def __init__(self, language: str = DEFAULT_LANGUAGE):
+        self.language = language     # plural rules for the token postings
+        self.stop_words = get_language(language).stop_words
+        self.entries: List[IndexedDescription] = []
+        self.token_postings: Dict[str, List[int]] = {}
+        self.trigram_postings: Dict[str, List[int]] = {}
+
+    @classmethod
+    def from_loaders(cls, loaders: Dict[str, RecallQuizLoader],
+                     language: str = DEFAULT_LANGUAGE) -> "RecallIndex":
+        index = cls(language)
+        for bank, loader in loaders.items():
+            for cat in loader.get_categories():
+                sets = loader.get_sets_for_category(cat)
+                norms = [[analyze(desc, language).norm for desc in s.descriptions] for s in sets]
+                in_sets = Counter(norm for set_norms in norms for norm in set(set_norms))
+                # A bullet shared by several sets is indexed once, so it can't be claimed twice.
+                seen: Set[str] = set()
+                for k, (item_set, set_norms) in enumerate(zip(sets, norms)):
+                    for slot, (desc, norm) in enumerate(zip(item_set.descriptions, set_norms)):
+                        if norm in seen:
+                            continue
+                        seen.add(norm)
+                        label = "" if in_sets[norm] == len(sets) else (item_set.label or f"set {k + 1}")
+                        index.add(IndexedDescription(bank=bank, category=cat, slot=slot, text=desc,
+                                                     set_label=label))
+        return index
+
+    def add(self, entry: IndexedDescription) -> int:
+        entry_id = len(self.entries)
+        self.entries.append(entry)
+
+        for tok in analyze(entry.text, self.language).variants:
+            self.token_postings.setdefault(tok, []).append(entry_id)
+
+        for gram in trigrams(entry.text, self.language):
+            self.trigram_postings.setdefault(gram, []).append(entry_id)
+        return entry_id
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def shortlist(self, text: str, limit: Optional[int] = None) -> List[int]:
+        # Candidate entry ids ranked by weighted posting overlap (best first).
+        limit = self.SHORTLIST_SIZE if limit is None else limit
+        terms: List[Tuple[List[int], float]] = []
+        for tok in analyze(text, self.language).variants:
+            if tok not in self.stop_words and tok in self.token_postings:
+                terms.append((self.token_postings[tok], self.TOKEN_WEIGHT))
+        for gram in trigrams(text, self.language):
+            if gram in self.trigram_postings:
+                terms.append((self.trigram_postings[gram], self.TRIGRAM_WEIGHT))
+
+        # Rarest terms first; stop once the common ones would only add noise and time.
+        cap = max(self.MIN_POSTING_CAP, int(self.MAX_POSTING_SHARE * len(self.entries)))
+        terms.sort(key=lambda term: len(term[0]))
+        scores: Dict[int, float] = {}
+        for n, (postings, weight) in enumerate(terms):
+            if len(postings) > cap and n >= self.RAREST_FALLBACK:
+                break
+            for entry_id in postings:
+                scores[entry_id] = scores.get(entry_id, 0.0) + weight
+
+        # A weak overlap still beats no candidate at all.
+        min_overlap = min(self.MIN_OVERLAP, max(scores.values(), default=0.0))
+        ranked = heapq.nlargest(limit, ((score, -entry_id) for entry_id, score in scores.items()
+                                        if score >= min_overlap))
+        return [-neg_id for _, neg_id in ranked]
+
+    def lookup(self, text: str, limit: int = 5) -> List[Tuple[IndexedDescription, float]]:
+        # Full similarity() scoring, but only over the shortlist.
+        scored = [(self.entries[i], similarity(text, self.entries[i].text, lang=self.language))
+                  for i in self.shortlist(text)]
+        scored.sort(key=lambda pair: -pair[1])
+        return scored[:limit]
+
+
+@dataclass
+class FreeRecallMatch:
+    user_text: str
+    entry: Optional[IndexedDescription]
+    sim: float
+
+
+def match_free_recall(index: RecallIndex, user_texts: Iterable[str]) -> List[FreeRecallMatch]:
+    # Match every typed line against the whole index.
+    # Each description can be claimed once: a repeated bullet falls through to its next best candidate.
+    claimed: Set[IndexedDescription] = set()
+    results: List[FreeRecallMatch] = []
+    for text in user_texts:
+        best: Optional[Tuple[IndexedDescription, float]] = None
+        for entry, sim in index.lookup(text, limit=index.SHORTLIST_SIZE):
+            if entry in claimed:
+                continue
+            best = (entry, sim)
+            break
+
+        if best is None or best[1] < MATCH_THRESHOLD:
+            results.append(FreeRecallMatch(user_text=text, entry=None, sim=best[1] if best else 0.0))
+            continue
+
+        entry, sim = best
+        claimed.add(entry)
+        results.append(FreeRecallMatch(user_text=text, entry=entry, sim=sim))
+    return results
+
+
+# ----------------------------
+# UI (Screen)
+# ----------------------------
+
+class FreeRecallScreen(ctk.CTkFrame):
+    # Exam-style recall: type any bullets you remember, from any category, one per line.
+    def __init__(self, master: ctk.CTk, loaders: Dict[str, RecallQuizLoader], on_back,
+                 language: str = DEFAULT_LANGUAGE, index: Optional[RecallIndex] = None):
+        super().__init__(master)
+        self.on_back = on_back
+        self.loaders = loaders
+        self.language = language
+        # The app passes an index it keeps per language, so reopening this screen doesn't rebuild it.
+        self.index = index if index is not None else RecallIndex.from_loaders(loaders, language)
+
+        self.COLOR_OK = "#4CAF50"
+        self.COLOR_BAD = "#F44336"
+
+        self.input_box: Optional[ctk.CTkTextbox] = None
+        self.results_frame: Optional[ctk.CTkScrollableFrame] = None
+        self.summary_label: Optional[ctk.CTkLabel] = None
+
+        self.show_input_screen()
+
+    def on_bank_changed(self, loader: RecallQuizLoader, categories: Set[str]) -> None:
+        # Rebuilding the index only reads the loaded sets, no file I/O.
+        if any(loader is ours for ours in self.loaders.values()):
+            self.index = RecallIndex.from_loaders(self.loaders, self.language)
+
+    def draw_watermark(self) -> None:
+        ctk.CTkLabel(self, text=WATERMARK_TEXT, font=("Arial", 10),
+                     text_color="gray50").place(relx=0.98, rely=0.98, anchor="se")
+
+    def clear_screen(self) -> None:
+        for widget in self.winfo_children():
+            widget.destroy()
+
+    def show_input_screen(self) -> None:
+        self.clear_screen()
+        self.draw_watermark()
+
+        top_bar = ctk.CTkFrame(self, fg_color="transparent")
+        top_bar.pack(fill="x", pady=(10, 0), padx=12)
+        ctk.CTkButton(top_bar, text="Back to menu", command=self.on_back, width=140).pack(side="left")
+
+        ctk.CTkLabel(self, text="Free Recall: All Categories",
+                     font=("Arial", 24, "bold")).pack(pady=(15, 5))
+        ctk.CTkLabel(
+            self,
+            text=f"Write every positive description you remember, one per line "
+                 f"({len(self.index)} descriptions in the bank).",
+            font=("Arial", 14),
+            text_color="gray80"
+        ).pack(pady=(0, 10))
+
+        self.input_box = ctk.CTkTextbox(self, height=320, font=("Arial", 14))
+        self.input_box.pack(fill="x", padx=30, pady=10)
+
+        controls = ctk.CTkFrame(self, fg_color="transparent")
+        controls.pack(fill="x", padx=30, pady=(0, 10))
+        ctk.CTkButton(controls, text="Check", command=self.on_check).pack(side="left")
+
+        self.summary_label = ctk.CTkLabel(controls, text="", font=("Arial", 14))
+        self.summary_label.pack(side="left", padx=15)
+
+        self.results_frame = ctk.CTkScrollableFrame(self, height=420)
+        self.results_frame.pack(fill="both", expand=True, padx=30, pady=(0, 30))
+
+        self.input_box.focus_set()
+
+    def on_check(self) -> None:
+        assert self.input_box is not None and self.results_frame is not None
+        raw = self.input_box.get("1.0", "end-1c")
+        record("free_recall_check", text=raw)
+        lines = [ln.strip() for ln in raw.splitlines()]
+        lines = [ln for ln in lines if ln]
+
+        t0 = time.perf_counter()
+        matches = match_free_recall(self.index, lines)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        for widget in self.results_frame.winfo_children():
+            widget.destroy()
+
+        for m in matches:
+            row = ctk.CTkFrame(self.results_frame, fg_color="transparent")
+            row.pack(fill="x", padx=10, pady=4)
+            if m.entry is None:
+                status = "Not close"
+                color = self.COLOR_BAD
+            else:
+                status = f"{m.entry.category} #{m.entry.slot + 1}"
+                if m.entry.set_label:
+                    status = f"{m.entry.category} ({m.entry.set_label}) #{m.entry.slot + 1}"
+                if len(self.loaders) > 1:
+                    status = f"[{m.entry.bank}] {status}"
+                color = self.COLOR_OK
+            ctk.CTkLabel(row, text=status, width=260, anchor="w", text_color=color,
+                         font=("Arial", 13, "bold")).pack(side="left")
+            detail = m.user_text if m.entry is None else f"{m.user_text}  →  {m.entry.text}"
+            ctk.CTkLabel(row, text=detail, anchor="w", justify="left", wraplength=800,
+                         font=("Arial", 13)).pack(side="left", fill="x", expand=True)
+
+        found = sum(1 for m in matches if m.entry is not None)
+        assert self.summary_label is not None
+        self.summary_label.configure(
+            text=f"Recognised {found} of {len(matches)} lines ({elapsed_ms:.1f} ms)"
+        )
+
+
+def main() -> None:
+    # Standalone runner (optional; keep for quick testing)
+    ctk.set_appearance_mode("dark")
+    root = ctk.CTk()
+    root.title(f"Skating Free Recall {VERSION}")
+    root.geometry("1200x1000")
+
+    loaders = {"pair": RecallQuizLoader(resource_path("quiz_data/pair-skating-plus.csv"))}
+    FreeRecallScreen(root, loaders=loaders, on_back=root.destroy).pack(fill="both", expand=True)
+    root.mainloop()
+
+
+if __name__ == "__main__":
+    main()
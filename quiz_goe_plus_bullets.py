@@ -3,12 +3,21 @@ import os
 import random
 import re
 import sys
+import unicodedata
 import ctypes
 import difflib
+import functools
+import itertools
 import tkinter as tk
 import customtkinter as ctk
+from collections import Counter
 from dataclasses import dataclass
-from typing import List, Dict, Tuple, Optional
+from typing import FrozenSet, List, Dict, Iterable, NamedTuple, Set, Tuple, Optional
+
+from languages import DEFAULT_LANGUAGE, get_language, on_forget_language
+from quiz_stats import bank_name, current_stats, record_recall_check
+from session_recorder import record
+from virtual_list import VirtualList
 
 try:
     from PIL import Image
@@ -35,71 +44,144 @@ def resource_path(relative_path: str) -> str:
         base_path = os.path.abspath(".")
     return os.path.join(base_path, relative_path)
 
-_WORD_RE = re.compile(r"[a-z0-9]+", re.IGNORECASE)
+_WORD_RE = re.compile(r"[^\W_]+")
+_PART_RE = re.compile(r"[\w']+|[^\w']+")
+
+_APOSTROPHES = frozenset("’ʼ")
+
+class _CompareTable(dict):
+    # str.translate table for the whole normalization: casefold, fancy apostrophes -> "'",
+    # letters/digits of any script kept, anything else -> space. Combining marks left over
+    # after NFC are dropped. Entries are filled in lazily per code point, so after warm-up
+    # translate() is a single C-level pass. (For ASCII this is exactly lowercase a-z/0-9/'.)
+    def __missing__(self, code: int) -> str:
+        ch = chr(code)
+        if ch in _APOSTROPHES:
+            out = "'"
+        else:
+            out = "".join(c if c.isalnum() or c == "'" else ("" if unicodedata.combining(c) else " ")
+                          for c in ch.casefold())
+        self[code] = out
+        return out
+
+_COMPARE_TABLE = _CompareTable()
+
+class TextAnalysis(NamedTuple):
+    norm: str                   # normalize_for_compare() result
+    tokens: Tuple[str, ...]     # tokenize() result
+    variants: FrozenSet[str]    # build_token_presence_set(tokens)
+
+@functools.lru_cache(maxsize=4096)
+def analyze(text: str, lang: str = DEFAULT_LANGUAGE) -> TextAnalysis:
+    # One pass: shorthand expanded, normalized text, tokens and their plural-tolerant variant set
+    # (synonym table and plural rules of lang). Cached: the same descriptions are compared over
+    # and over while grading.
+    text = get_language(lang).expand(text)
+    if not text.isascii():
+        text = unicodedata.normalize("NFC", text)
+    norm = " ".join(text.translate(_COMPARE_TABLE).split())
+    tokens = tuple(norm.replace("'", " ").split())
+    variants = frozenset(v for tok in tokens for v in _token_variants(tok, lang))
+    return TextAnalysis(norm, tokens, variants)
 
 def normalize_for_compare(text: str) -> str:
     # Lowercase, remove punctuation-ish noise, normalize whitespace.
-    text = text.lower()
-    text = text.replace("’", "'").replace("–", "-").replace("—", "-")
-    text = re.sub(r"[\(\)\[\]\{\}]", " ", text)
-    text = re.sub(r"[^a-z0-9\s']", " ", text)  # keep letters/numbers/spaces/apostrophe
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    return analyze(text).norm
 
 def tokenize(text: str) -> List[str]:
-    return _WORD_RE.findall(normalize_for_compare(text))
+    return list(analyze(text).tokens)
 
-def token_variants(tok: str) -> List[str]:
-    # Very lightweight plural tolerance:
+@functools.lru_cache(maxsize=8192)
+def _token_variants(tok: str, lang: str = DEFAULT_LANGUAGE) -> Tuple[str, ...]:
+    # Very lightweight plural tolerance, per language (see languages.py):
     # - cats -> cat
     # - bodies -> body
     # Keeps original too.
-    out = [tok]
-    if len(tok) > 3:
-        if tok.endswith("ies") and len(tok) > 4:
-            out.append(tok[:-3] + "y")
-        if tok.endswith("s") and not tok.endswith("ss"):
-            out.append(tok[:-1])
-    seen = set()
-    uniq = []
-    for t in out:
-        if t and t not in seen:
-            seen.add(t)
-            uniq.append(t)
-    return uniq
-
-def build_token_presence_set(tokens: List[str]) -> set:
+    return get_language(lang).variants(tok)
+
+def _forget_cached_analysis(lang: str) -> None:
+    # lru_cache can't drop one language's entries, so an evicted language clears the text caches;
+    # the selected language's entries come back on first use.
+    analyze.cache_clear()
+    _token_variants.cache_clear()
+
+on_forget_language(_forget_cached_analysis)
+
+def token_variants(tok: str, lang: str = DEFAULT_LANGUAGE) -> List[str]:
+    return list(_token_variants(tok, lang))
+
+def build_token_presence_set(tokens: Iterable[str], lang: str = DEFAULT_LANGUAGE) -> set:
     s = set()
     for tok in tokens:
-        for v in token_variants(tok):
-            s.add(v)
+        s.update(_token_variants(tok, lang))
     return s
 
-def similarity(user_text: str, correct_text: str) -> float:
-    # Blend character similarity (typos) + token overlap (word-level robustness).
-    u = normalize_for_compare(user_text)
-    c = normalize_for_compare(correct_text)
+@dataclass(frozen=True)
+class ScoringConfig:
+    # Recall grading constants. Hand-tuned; tools/calibrate_scoring.py searches them against a labelled corpus.
+    char_weight: float = 0.65       # similarity = char_weight * char ratio + token_weight * token overlap
+    token_weight: float = 0.35
+    group_penalty: float = 0.12     # assignment penalty for matching across top3/last3
+    pos_penalty: float = 0.06       # assignment penalty for a different position
+    weak_cutoff: float = 0.45       # below this a similarity barely counts in the assignment...
+    weak_factor: float = 0.2        # ...it's scaled by this
+    match_threshold: float = 0.55   # below this a row is "Not close"
+
+DEFAULT_SCORING = ScoringConfig()
+
+def similarity_components(user_text: str, correct_text: str,
+                          lang: str = DEFAULT_LANGUAGE) -> Tuple[float, float]:
+    # (character similarity, token overlap) - the expensive part of similarity(), independent of weights.
+    ua = analyze(user_text, lang)
+    ca = analyze(correct_text, lang)
+    u = ua.norm
+    c = ca.norm
 
     if not u and not c:
-        return 1.0
+        return 1.0, 1.0
     if not u or not c:
-        return 0.0
+        return 0.0, 0.0
 
     char_ratio = difflib.SequenceMatcher(None, u, c).ratio()
+    return char_ratio, _token_score(ua.variants, ca.variants)
 
-    utoks = tokenize(user_text)
-    ctoks = tokenize(correct_text)
-    uset = build_token_presence_set(utoks)
-    cset = build_token_presence_set(ctoks)
-
+def _token_score(uset: FrozenSet[str], cset: FrozenSet[str]) -> float:
     if not uset and not cset:
-        token_score = 1.0
-    elif not uset or not cset:
-        token_score = 0.0
-    else:
-        token_score = len(uset & cset) / len(uset | cset)
+        return 1.0
+    if not uset or not cset:
+        return 0.0
+    return len(uset & cset) / len(uset | cset)
+
+@functools.lru_cache(maxsize=4096)
+def _char_counts(norm: str) -> Counter:
+    return Counter(norm)
+
+def similarity_upper_bound(user_text: str, correct_text: str, config: ScoringConfig = DEFAULT_SCORING,
+                           lang: str = DEFAULT_LANGUAGE) -> float:
+    # Never below similarity(), at a fraction of the cost: the character part uses difflib's
+    # quick_ratio() bound (shared character counts, ignoring order), which ratio() can't exceed.
+    ua = analyze(user_text, lang)
+    ca = analyze(correct_text, lang)
+    u = ua.norm
+    c = ca.norm
+
+    if not u and not c:
+        return blend_similarity((1.0, 1.0), config)
+    if not u or not c:
+        return blend_similarity((0.0, 0.0), config)
+
+    shared = sum((_char_counts(u) & _char_counts(c)).values())
+    char_bound = 2.0 * shared / (len(u) + len(c))
+    return blend_similarity((char_bound, _token_score(ua.variants, ca.variants)), config)
 
-    return 0.65 * char_ratio + 0.35 * token_score
+def blend_similarity(components: Tuple[float, float], config: ScoringConfig = DEFAULT_SCORING) -> float:
+    char_ratio, token_score = components
+    return config.char_weight * char_ratio + config.token_weight * token_score
+
+def similarity(user_text: str, correct_text: str, config: ScoringConfig = DEFAULT_SCORING,
+               lang: str = DEFAULT_LANGUAGE) -> float:
+    # Blend character similarity (typos) + token overlap (word-level robustness).
+    return blend_similarity(similarity_components(user_text, correct_text, lang), config)
 
 def group_of_index(i: int) -> int:
     # Expected indices are 0..5. Group 0 is top 3, group 1 is last 3.
@@ -114,25 +196,50 @@ class RecallItemSet:
     # One quiz unit: 6 ordered descriptions for a component/category.
     category: str
     descriptions: List[str]  # length 6 (ordered)
+    label: str = ""          # which alternative set (season, level, ...); "" if the category has one
 
 class RecallQuizLoader:
     # Loads a CSV where each row is:
-    #     Category ; Description
+    #     Category ; Description [; Set]
     #
     # With the project rule:
-    #   - Each category has exactly 6 descriptions (no more, no less).
+    #   - Each set has exactly 6 descriptions (no more, no less).
     #   - Descriptions may optionally be prefixed with "1) ...", ..., "6) ...".
-    def __init__(self, filename: str):
+    #   - The optional third column names alternative sets of the same category (e.g. "2024/25"
+    #     and "2025/26"); rows without it form the category's unnamed set. Answers are graded
+    #     against every set of the category.
+    def __init__(self, filename: str, language: str = DEFAULT_LANGUAGE):
         self.filename = filename
+        self.language = language
         self.sets_by_category: Dict[str, List[RecallItemSet]] = {}
         self._load()
 
     def _load(self) -> None:
+        self.sets_by_category = self.read_categories()
+
+    def read_categories(self) -> Dict[str, List[RecallItemSet]]:
+        # Parses the whole file without touching the loaded sets (safe to call off the UI thread).
+        return {cat: self._parse_sets(cat, by_label) for cat, by_label in self._read_rows().items()}
+
+    def changed_categories(self, parsed: Dict[str, List[RecallItemSet]]) -> Set[str]:
+        # Categories added, removed or edited in `parsed` compared to what is loaded.
+        loaded = self.sets_by_category
+        return {c for c in loaded.keys() | parsed.keys() if loaded.get(c) != parsed.get(c)}
+
+    def apply_categories(self, parsed: Dict[str, List[RecallItemSet]], categories: Iterable[str]) -> None:
+        for cat in categories:
+            if cat in parsed:
+                self.sets_by_category[cat] = parsed[cat]
+            else:
+                self.sets_by_category.pop(cat, None)
+
+    def _read_rows(self) -> Dict[str, Dict[str, List[str]]]:
+        # {category: {set label: [descriptions]}}, both in file order.
         if not os.path.exists(self.filename):
             raise FileNotFoundError(self.filename)
 
-        rows: List[Tuple[str, str]] = []
-        with open(self.filename, mode="r", encoding="ANSI") as f:
+        rows: List[Tuple[str, str, str]] = []
+        with open(self.filename, mode="r", encoding=get_language(self.language).encoding) as f:
             reader = csv.reader(f, delimiter=";")
             for row in reader:
                 if len(row) < 2:
@@ -143,22 +250,33 @@ class RecallQuizLoader:
                     continue
                 if cat.lower() in {"element category", "category"}:
                     continue
-                rows.append((cat, desc))
-
-        by_cat: Dict[str, List[str]] = {}
-        for cat, desc in rows:
-            by_cat.setdefault(cat, []).append(desc)
+                label = row[2].strip() if len(row) > 2 else ""
+                rows.append((cat, desc, label))
+
+        by_cat: Dict[str, Dict[str, List[str]]] = {}
+        for cat, desc, label in rows:
+            by_cat.setdefault(cat, {}).setdefault(label, []).append(desc)
+        return by_cat
+
+    def reload_categories(self, categories: Iterable[str]) -> None:
+        # Re-read the file but only re-parse the given categories (others keep their sets).
+        by_cat = self._read_rows()
+        for cat in categories:
+            if cat in by_cat:
+                self.sets_by_category[cat] = self._parse_sets(cat, by_cat[cat])
+            else:
+                self.sets_by_category.pop(cat, None)
 
-        for cat, descs in by_cat.items():
-            item_set = self._parse_exact_six(cat, descs)
-            self.sets_by_category[cat] = [item_set]
+    def _parse_sets(self, category: str, by_label: Dict[str, List[str]]) -> List[RecallItemSet]:
+        return [self._parse_exact_six(category, descs, label) for label, descs in by_label.items()]
 
-    def _parse_exact_six(self, category: str, descs: List[str]) -> RecallItemSet:
+    def _parse_exact_six(self, category: str, descs: List[str], label: str = "") -> RecallItemSet:
         number_re = re.compile(r"^\s*([1-6])\)\s*(.+?)\s*$")
+        where = f"Category '{category}'" + (f" (set '{label}')" if label else "")
 
         if len(descs) != 6:
             raise ValueError(
-                f"Category '{category}' must have exactly 6 descriptions, found {len(descs)}"
+                f"{where} must have exactly 6 descriptions, found {len(descs)}"
             )
 
         parsed: List[Optional[str]] = [None] * 6
@@ -179,13 +297,13 @@ class RecallQuizLoader:
             # Require all 1..6 to be present exactly once
             if any(x is None for x in parsed):
                 raise ValueError(
-                    f"Category '{category}' uses numbering but is missing one of 1)..6)"
+                    f"{where} uses numbering but is missing one of 1)..6)"
                 )
-            return RecallItemSet(category=category, descriptions=[x for x in parsed if x is not None])
+            return RecallItemSet(category=category, descriptions=[x for x in parsed if x is not None], label=label)
 
         # No numbering: keep original order, just strip any whitespace
         cleaned = [d.strip() for d in descs]
-        return RecallItemSet(category=category, descriptions=cleaned)
+        return RecallItemSet(category=category, descriptions=cleaned, label=label)
 
     def get_categories(self) -> List[str]:
         return sorted(self.sets_by_category.keys())
@@ -204,7 +322,8 @@ class MatchResult:
     matched_correct: Optional[int]  # 0..5 or None
     sim: float
 
-def best_assignment(user_texts: List[str], correct_texts: List[str]) -> List[MatchResult]:
+def best_assignment(user_texts: List[str], correct_texts: List[str],
+                    config: ScoringConfig = DEFAULT_SCORING, lang: str = DEFAULT_LANGUAGE) -> List[MatchResult]:
     # Compute best one-to-one assignment (size 6) with a learning-friendly objective:
     #
     # Priority (highest to lowest):
@@ -213,36 +332,49 @@ def best_assignment(user_texts: List[str], correct_texts: List[str]) -> List[Mat
     #   3) correct exact order inside group
     #
     # We allow cross-group "steal" but with penalty.
-    n = 6
-    sims = [[similarity(user_texts[i], correct_texts[j]) for j in range(n)] for i in range(n)]
+    return assignment_from_components(_components(user_texts[:6], correct_texts[:6], lang), config)
 
+def _pair_gain(sim: float, user_i: int, corr_j: int, config: ScoringConfig) -> float:
     # Penalties are tuned to *nudge* behavior without making it feel like grading.
-    GROUP_PENALTY = 0.12
-    POS_PENALTY = 0.06
+    # Non-decreasing in sim, so an upper bound on sim gives an upper bound on the gain.
+    s = sim
+    if s < config.weak_cutoff:
+        # Treat very low matches as basically not helpful; still allow assignment but it won't win.
+        s *= config.weak_factor
+
+    # group penalty
+    if group_of_index(user_i) != group_of_index(corr_j):
+        s -= config.group_penalty
+
+    # exact position penalty (within group)
+    if user_i != corr_j:
+        s -= config.pos_penalty
+    return s
+
+def assignment_from_components(components: List[List[Tuple[float, float]]],
+                               config: ScoringConfig = DEFAULT_SCORING) -> List[MatchResult]:
+    # best_assignment() on precomputed similarity_components, so calibration can re-grade
+    # the same answers under many configs without recomputing the string comparisons.
+    return scored_assignment(components, config)[1]
+
+def scored_assignment(components: List[List[Tuple[float, float]]],
+                      config: ScoringConfig = DEFAULT_SCORING) -> Tuple[float, List[MatchResult]]:
+    # (objective, matches): the objective is what the assignment maximizes, comparable across sets.
+    n = 6
+    sims = [[blend_similarity(components[i][j], config) for j in range(n)] for i in range(n)]
+
+    # A pair's contribution doesn't depend on the rest of the permutation, so precompute it.
+    gains = [[_pair_gain(sims[i][j], i, j, config) for j in range(n)] for i in range(n)]
 
     best_score = -1e9
     best_perm: Optional[Tuple[int, ...]] = None
 
     # brute force all permutations of mapping user_slot -> correct_index
     # 6! = 720, totally fine.
-    import itertools
     for perm in itertools.permutations(range(n)):
         score = 0.0
         for user_i, corr_j in enumerate(perm):
-            s = sims[user_i][corr_j]
-            if s < 0.45:
-                # Treat very low matches as basically not helpful; still allow assignment but it won't win.
-                s *= 0.2
-
-            # group penalty
-            if group_of_index(user_i) != group_of_index(corr_j):
-                s -= GROUP_PENALTY
-
-            # exact position penalty (within group)
-            if user_i != corr_j:
-                s -= POS_PENALTY
-
-            score += s
+            score += gains[user_i][corr_j]
 
         if score > best_score:
             best_score = score
@@ -252,7 +384,48 @@ def best_assignment(user_texts: List[str], correct_texts: List[str]) -> List[Mat
     assert best_perm is not None
     for i, j in enumerate(best_perm):
         results.append(MatchResult(user_slot=i, matched_correct=j, sim=sims[i][j]))
-    return results
+    return best_score, results
+
+def assignment_upper_bound(user_texts: List[str], correct_texts: List[str],
+                           config: ScoringConfig = DEFAULT_SCORING, lang: str = DEFAULT_LANGUAGE) -> float:
+    # Relaxed objective: every row takes its best column (no one-to-one rule) with upper-bound
+    # similarities, so no assignment against these texts can score higher.
+    return sum(
+        max(_pair_gain(similarity_upper_bound(u, c, config, lang), i, j, config) for j, c in enumerate(correct_texts))
+        for i, u in enumerate(user_texts)
+    )
+
+@dataclass
+class SetGrade:
+    set_index: int
+    item_set: RecallItemSet
+    score: float                # assignment objective; higher is better
+    matches: List[MatchResult]
+
+def grade_against_sets(user_texts: List[str], sets: List[RecallItemSet],
+                       config: ScoringConfig = DEFAULT_SCORING, lang: str = DEFAULT_LANGUAGE) -> SetGrade:
+    # The best-matching set of a category. Sets are tried in order of their upper bound, and the
+    # search stops at the first bound that can't beat the best full grade so far, so usually
+    # only one or two sets pay for the real string comparisons.
+    if len(sets) == 1:
+        score, matches = scored_assignment(_components(user_texts, sets[0].descriptions, lang), config)
+        return SetGrade(0, sets[0], score, matches)
+
+    bounds = sorted((-assignment_upper_bound(user_texts, s.descriptions, config, lang), k)
+                    for k, s in enumerate(sets))
+    best: Optional[SetGrade] = None
+    for neg_bound, k in bounds:
+        if best is not None and -neg_bound <= best.score:
+            break
+        score, matches = scored_assignment(_components(user_texts, sets[k].descriptions, lang), config)
+        if best is None or score > best.score:
+            best = SetGrade(k, sets[k], score, matches)
+    assert best is not None
+    return best
+
+def _components(user_texts: List[str], correct_texts: List[str],
+                lang: str = DEFAULT_LANGUAGE) -> List[List[Tuple[float, float]]]:
+    return [[similarity_components(u, c, lang) for c in correct_texts] for u in user_texts]
 
 
 # ----------------------------
@@ -260,7 +433,8 @@ def best_assignment(user_texts: List[str], correct_texts: List[str]) -> List[Mat
 # ----------------------------
 
 class RecallQuizScreen(ctk.CTkFrame):
-    def __init__(self, master: ctk.CTk, loader: "RecallQuizLoader", on_back):
+    def __init__(self, master: ctk.CTk, loader: "RecallQuizLoader", on_back,
+                 scoring: ScoringConfig = DEFAULT_SCORING):
         super().__init__(master)
 
         # Optional; main app sets its own AppUserModelID already.
@@ -272,6 +446,7 @@ class RecallQuizScreen(ctk.CTkFrame):
 
         self.on_back = on_back
         self.loader = loader
+        self.scoring = scoring
 
         # icon (apply to the root/master, not the frame)
         try:
@@ -300,13 +475,24 @@ class RecallQuizScreen(ctk.CTkFrame):
         self.COLOR_BAD = "#F44336"
         self.COLOR_BORDER_DEFAULT = "#3a3a3a"
 
+        # Persistent pages: the category list and the recall layout (built on first use, then reused)
+        self.category_page: Optional[ctk.CTkFrame] = None
+        self.recall_page: Optional[ctk.CTkFrame] = None
+        self.category_label: Optional[ctk.CTkLabel] = None
+        self.summary_label: Optional[ctk.CTkLabel] = None
+        self._checks_on_set = 0      # the first Check of a set is the real recall, later ones are retries
+        self._rendered_rows: List[dict] = []
+        self._rendered_refs: List[str] = []
+        self.category_list: Optional[VirtualList] = None
+
+        self.draw_watermark()
         self.setup_category_selection()
 
     def draw_watermark(self) -> None:
-        ctk.CTkLabel(self, text=WATERMARK_TEXT, font=("Arial", 10),
-                     text_color="gray50").place(relx=0.98, rely=0.98, anchor="se")
+        self._watermark = ctk.CTkLabel(self, text=WATERMARK_TEXT, font=("Arial", 10), text_color="gray50")
+        self._watermark.place(relx=0.98, rely=0.98, anchor="se")
 
-    def draw_logo(self) -> None:
+    def draw_logo(self, parent: ctk.CTkFrame) -> None:
         if Image is None:
             return
         try:
@@ -315,65 +501,114 @@ class RecallQuizScreen(ctk.CTkFrame):
                 return
             img = Image.open(logo_path)
             logo = ctk.CTkImage(light_image=img, dark_image=img, size=(80, 80))
-            ctk.CTkLabel(self, image=logo, text="").place(x=20, y=20)
+            ctk.CTkLabel(parent, image=logo, text="").place(x=20, y=20)
             self._logo_ref = logo
         except Exception:
             pass
 
-    def clear_screen(self) -> None:
-        for widget in self.winfo_children():
-            widget.destroy()
+    def _show_page(self, page: ctk.CTkFrame) -> None:
+        # Pages are children of this frame; only one is packed at a time.
+        for other in (self.category_page, self.recall_page):
+            if other is not None and other is not page:
+                other.pack_forget()
+        page.pack(fill="both", expand=True)
+        self._watermark.lift()
+
+    def back_to_categories(self) -> None:
+        record("categories")
+        self.setup_category_selection()
 
     def setup_category_selection(self) -> None:
-        self.clear_screen()
-        self.draw_watermark()
-        self.draw_logo()
+        # Built once; data updates refresh the list in place (on_bank_changed), so coming back
+        # only packs the page again.
+        if self.category_page is not None:
+            self._show_page(self.category_page)
+            return
+        page = ctk.CTkFrame(self, fg_color="transparent")
+        self.category_page = page
+        self.draw_logo(page)
 
-        ctk.CTkLabel(self, text="Recall Mode: Positive Descriptions",
+        ctk.CTkLabel(page, text="Recall Mode: Positive Descriptions",
                      font=("Arial", 24, "bold")).pack(pady=(25, 10))
 
         ctk.CTkLabel(
-            self,
+            page,
             text="Type the 6 descriptions from memory. Typos/punctuation/plural forms are OK.",
             font=("Arial", 14),
             text_color="gray80"
         ).pack(pady=(0, 10))
 
-        ctk.CTkButton(self, text="Back to menu", command=self.on_back).pack(pady=(0, 15))
+        ctk.CTkButton(page, text="Back to menu", command=self.on_back).pack(pady=(0, 15))
+
+        # Only the visible rows are built, so this stays cheap for very large banks.
+        self.category_list = VirtualList(page, self._category_items(), on_pick=self.start_quiz,
+                                         width=700, height=520, row_pady=6)
+        self.category_list.pack(pady=10)
 
-        scroll = ctk.CTkScrollableFrame(self, width=700, height=520)
-        scroll.pack(pady=10)
+        self._show_page(page)
 
+    def _category_items(self) -> List[Tuple[str, str]]:
+        items = []
         for cat in self.loader.get_categories():
             sets_count = len(self.loader.get_sets_for_category(cat))
             label = f"{cat}  ({sets_count} set{'s' if sets_count != 1 else ''})"
-            ctk.CTkButton(scroll, text=label, height=40,
-                          command=lambda c=cat: self.start_quiz(c)).pack(pady=6, fill="x", padx=20)
+            items.append((label, cat))
+        return items
 
-    def start_quiz(self, category: str) -> None:
+    def on_bank_changed(self, loader: "RecallQuizLoader", categories: Set[str]) -> None:
+        # Some categories were edited/synced. The open set stays as it is until the next pick.
+        if loader is self.loader and self.category_list is not None:
+            self.category_list.set_items(self._category_items())
+
+    def start_quiz(self, category: str, set_index: Optional[int] = None) -> None:
         sets = self.loader.get_sets_for_category(category)
         if not sets:
             return
-        self.current_set = random.choice(sets)
+        if set_index is None or not 0 <= set_index < len(sets):
+            set_index = random.randrange(len(sets))
+        record("category", category=category, set_index=set_index)
+        self.current_set = sets[set_index]
         self.show_recall_screen()
 
     def show_recall_screen(self) -> None:
+        # The recall layout is built once per screen and reset in place for every category.
         assert self.current_set is not None
 
-        self.clear_screen()
-        self.draw_watermark()
+        if self.recall_page is None:
+            self._build_recall_layout()
+        assert self.recall_page is not None and self.category_label is not None
+
+        self.category_label.configure(text=self.current_set.category)
+        self._checks_on_set = 0
+        assert self.summary_label is not None
+        self.summary_label.configure(text="")
+        for ent in self.entries:
+            if ent.get():
+                ent.delete(0, "end")
+        for i in range(6):
+            self._apply_row(i, "", self.COLOR_OK, self.COLOR_BORDER_DEFAULT, None)
+        for i in range(6):
+            self._apply_ref_label(i, f"{i+1}.")
 
-        top_bar = ctk.CTkFrame(self, fg_color="transparent")
+        self._show_page(self.recall_page)
+        self.entries[0].focus_set()
+
+    def _build_recall_layout(self) -> None:
+        page = ctk.CTkFrame(self, fg_color="transparent")
+        self.recall_page = page
+
+        top_bar = ctk.CTkFrame(page, fg_color="transparent")
         top_bar.pack(fill="x", pady=(10, 0), padx=12)
         ctk.CTkButton(top_bar, text="Back to menu", command=self.on_back, width=140).pack(side="left")
 
-        ctk.CTkLabel(self, text=self.current_set.category,
-                     font=("Arial", 18, "italic"), text_color="gray70").pack(pady=(10, 5))
+        self.category_label = ctk.CTkLabel(page, text="",
+                                           font=("Arial", 18, "italic"), text_color="gray70")
+        self.category_label.pack(pady=(10, 5))
 
-        ctk.CTkLabel(self, text="Write all 6 positive descriptions",
+        ctk.CTkLabel(page, text="Write all 6 positive descriptions",
                      font=("Arial", 22, "bold")).pack(pady=(0, 10))
 
-        container = ctk.CTkFrame(self, fg_color="transparent")
+        container = ctk.CTkFrame(page, fg_color="transparent")
         container.pack(fill="both", expand=True, padx=20, pady=10)
 
         # Two groups: top3 and last3
@@ -399,7 +634,7 @@ class RecallQuizScreen(ctk.CTkFrame):
             mid = ctk.CTkFrame(row, fg_color="transparent")
             mid.pack(side="left", fill="x", expand=True, padx=(8, 10))
 
-            ent = ctk.CTkEntry(mid, height=34)
+            ent = ctk.CTkEntry(mid, height=34, border_color=self.COLOR_BORDER_DEFAULT)
             ent.pack(side="top", fill="x", expand=True)
 
             txt = tk.Text(
@@ -431,16 +666,20 @@ class RecallQuizScreen(ctk.CTkFrame):
         for i in range(3, 6):
             add_row(bottom_frame, i)
 
-        self._reset_entry_styles()
-        self._clear_inline_highlights()
+        # What each row currently shows, so updates only touch widgets that actually change.
+        self._rendered_rows = [
+            {"status": ("", None), "border": self.COLOR_BORDER_DEFAULT, "highlight": "unset"} for _ in range(6)
+        ]
 
         controls = ctk.CTkFrame(container, fg_color="transparent")
         controls.pack(fill="x", padx=10, pady=(0, 10))
 
         ctk.CTkButton(controls, text="Check", command=self.on_check).pack(side="left", padx=(0, 10))
+        self.summary_label = ctk.CTkLabel(controls, text="", font=("Arial", 13), text_color="gray80")
+        self.summary_label.pack(side="left", padx=5)
 
         ctk.CTkButton(controls, text="Back to categories",
-                      command=self.setup_category_selection).pack(side="right")
+                      command=self.back_to_categories).pack(side="right")
 
         self.correct_ref_frame = ctk.CTkScrollableFrame(container, height=220)
         self.correct_ref_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
@@ -449,29 +688,53 @@ class RecallQuizScreen(ctk.CTkFrame):
                      font=("Arial", 14, "bold")).pack(anchor="w", padx=10, pady=(10, 6))
 
         self.correct_ref_labels = []
+        self._rendered_refs = []
         for i in range(6):
             lbl = ctk.CTkLabel(self.correct_ref_frame, text=f"{i+1}.",
                                font=("Arial", 13), text_color="gray80",
                                wraplength=920, justify="left")
             lbl.pack(anchor="w", padx=20, pady=2)
             self.correct_ref_labels.append(lbl)
+            self._rendered_refs.append(f"{i+1}.")
 
-        self.entries[0].focus_set()
+    def _apply_row(self, i: int, status_text: str, status_color: str, border: str,
+                   highlight: Optional[Tuple[str, str]]) -> None:
+        # Diff against the last render of row i; highlight None means the neutral placeholder.
+        rendered = self._rendered_rows[i]
 
-    def _reset_entry_styles(self) -> None:
-        # Return all entry boxes to a neutral look.
-        for ent in self.entries:
+        status = (status_text, status_color if status_text else None)
+        if rendered["status"] != status:
+            if status_text:
+                self.status_labels[i].configure(text=status_text, text_color=status_color)
+            else:
+                self.status_labels[i].configure(text="")
+            rendered["status"] = status
+
+        if rendered["border"] != border:
             try:
-                ent.configure(border_color=self.COLOR_BORDER_DEFAULT)
+                self.entries[i].configure(border_color=border)
             except Exception:
                 pass
+            rendered["border"] = border
 
-    def _clear_inline_highlights(self) -> None:
-        for txt in self.inline_highlights:
-            txt.configure(state="normal")
-            txt.delete("1.0", "end")
-            txt.insert("end", "Highlight will appear here after Check.", "neutral")
-            txt.configure(state="disabled")
+        if rendered["highlight"] != highlight:
+            if highlight is None:
+                self._clear_inline_highlight(i)
+            else:
+                self._fill_inline_highlight(i, *highlight)
+            rendered["highlight"] = highlight
+
+    def _apply_ref_label(self, idx: int, text: str) -> None:
+        if self._rendered_refs[idx] != text:
+            self.correct_ref_labels[idx].configure(text=text)
+            self._rendered_refs[idx] = text
+
+    def _clear_inline_highlight(self, row_index: int) -> None:
+        txt = self.inline_highlights[row_index]
+        txt.configure(state="normal")
+        txt.delete("1.0", "end")
+        txt.insert("end", "Highlight will appear here after Check.", "neutral")
+        txt.configure(state="disabled")
 
     def _fill_inline_highlight(self, row_index: int, user_text: str, correct_text: str) -> None:
         # Render user's text with per-word colors compared to correct_text.
@@ -479,13 +742,14 @@ class RecallQuizScreen(ctk.CTkFrame):
         txt.configure(state="normal")
         txt.delete("1.0", "end")
 
-        other_set = build_token_presence_set(tokenize(correct_text))
-        parts = re.findall(r"[A-Za-z0-9']+|[^A-Za-z0-9']+", user_text)
+        lang = self.loader.language
+        other_set = analyze(correct_text, lang).variants
+        parts = _PART_RE.findall(user_text)
 
         for part in parts:
             if _WORD_RE.fullmatch(part.strip()):
-                tok = normalize_for_compare(part).strip("'")
-                present = any(v in other_set for v in token_variants(tok))
+                # Analyzed like the answer itself, so shorthand ("TO") is checked as its expansion.
+                present = not analyze(part, lang).variants.isdisjoint(other_set)
                 txt.insert("end", part, "good" if present else "bad")
             else:
                 txt.insert("end", part, "neutral")
@@ -498,62 +762,69 @@ class RecallQuizScreen(ctk.CTkFrame):
     def on_check(self) -> None:
         assert self.current_set is not None
         user_texts = [e.get().strip() for e in self.entries]
-        correct = self.current_set.descriptions
-
-        matches = best_assignment(user_texts, correct)
-
-        # Update row statuses + entry border colors + INLINE word highlights
+        record("recall_check", entries=[e.get() for e in self.entries])
+
+        # Every alternative set of the category is a valid answer key; grade against the best one.
+        category = self.current_set.category
+        sets = self.loader.get_sets_for_category(category) or [self.current_set]
+        grade = grade_against_sets(user_texts, sets, self.scoring, self.loader.language)
+        correct = grade.item_set.descriptions
+        matches = grade.matches
+        if len(sets) > 1:
+            assert self.category_label is not None
+            title = grade.item_set.label or f"set {grade.set_index + 1}"
+            self.category_label.configure(text=f"{category}  ·  best match: {title} ({len(sets)} sets)")
+
+        # Row statuses + entry border colors + INLINE word highlights (only rows that changed are redrawn)
         for m in matches:
             i = m.user_slot
             j = m.matched_correct
             sim = m.sim
 
             if not user_texts[i]:
-                self.status_labels[i].configure(text="Blank", text_color=self.COLOR_BAD)
-                try:
-                    self.entries[i].configure(border_color=self.COLOR_BAD)
-                except Exception:
-                    pass
-                self._fill_inline_highlight(i, "", "")
+                self._apply_row(i, "Blank", self.COLOR_BAD, self.COLOR_BAD, ("", ""))
                 continue
 
-            if sim < 0.55 or j is None:
-                self.status_labels[i].configure(text="Not close", text_color=self.COLOR_BAD)
-                try:
-                    self.entries[i].configure(border_color=self.COLOR_BAD)
-                except Exception:
-                    pass
+            if sim < self.scoring.match_threshold or j is None:
                 # Still show something: compare to the same-slot correct as a hint
-                self._fill_inline_highlight(i, user_texts[i], correct[i])
+                self._apply_row(i, "Not close", self.COLOR_BAD, self.COLOR_BAD, (user_texts[i], correct[i]))
                 continue
 
             same_group = (group_of_index(i) == group_of_index(j))
             if i == j:
-                self.status_labels[i].configure(text=f"Matches #{j+1} (correct spot)", text_color=self.COLOR_OK)
-                try:
-                    self.entries[i].configure(border_color=self.COLOR_OK)
-                except Exception:
-                    pass
+                text, color = f"Matches #{j+1} (correct spot)", self.COLOR_OK
             elif same_group:
-                self.status_labels[i].configure(text=f"Matches #{j+1} (wrong order)", text_color=self.COLOR_WARN)
-                try:
-                    self.entries[i].configure(border_color=self.COLOR_WARN)
-                except Exception:
-                    pass
+                text, color = f"Matches #{j+1} (wrong order)", self.COLOR_WARN
             else:
-                self.status_labels[i].configure(text=f"Matches #{j+1} (wrong group)", text_color=self.COLOR_MID)
-                try:
-                    self.entries[i].configure(border_color=self.COLOR_MID)
-                except Exception:
-                    pass
+                text, color = f"Matches #{j+1} (wrong group)", self.COLOR_MID
 
             # Inline word highlight: YOUR text vs the matched correct description
-            self._fill_inline_highlight(i, user_texts[i], correct[j])
+            self._apply_row(i, text, color, color, (user_texts[i], correct[j]))
 
         # Bottom reference: show correct answers in order ONLY
-        if self.correct_ref_labels:
-            for idx, txt in enumerate(correct):
-                self.correct_ref_labels[idx].configure(text=f"{idx+1}. {txt}")
+        for idx, txt in enumerate(correct):
+            self._apply_ref_label(idx, f"{idx+1}. {txt}")
+
+        self._summarize_check(category, correct, user_texts, matches)
+
+    def _summarize_check(self, category: str, correct: List[str], user_texts: List[str],
+                         matches: List[MatchResult]) -> None:
+        # Per-bullet similarity into the statistics (blank rows count as 0), plus a one-line summary.
+        bullet_sims = [(correct[m.matched_correct], m.sim if user_texts[m.user_slot] else 0.0)
+                       for m in matches if m.matched_correct is not None]
+        retry = self._checks_on_set > 0
+        self._checks_on_set += 1
+        record_recall_check(self.loader, category, bullet_sims, retry)
+
+        found = sum(1 for _, sim in bullet_sims if sim >= self.scoring.match_threshold)
+        mean = sum(sim for _, sim in bullet_sims) / len(bullet_sims) if bullet_sims else 0.0
+        text = f"{found}/{len(correct)} recognised, {mean:.0%} mean similarity"
+        stats = current_stats()
+        lifetime = stats.recall_categories.get((bank_name(self.loader), category)) if stats is not None else None
+        if lifetime is not None and lifetime.count:
+            text += f"  ·  all time {lifetime.mean:.0%} on the first check"
+        assert self.summary_label is not None
+        self.summary_label.configure(text=text)
 
     def _render_highlighted_text(self, parent: ctk.CTkFrame, base_text: str, other_text: str, mode: str) -> None:
         # Word-level highlight:
@@ -570,15 +841,15 @@ class RecallQuizScreen(ctk.CTkFrame):
         base_tokens = tokenize(base_text)
         other_tokens = tokenize(other_text)
 
-        other_set = build_token_presence_set(other_tokens)
+        other_set = build_token_presence_set(other_tokens, self.loader.language)
 
         # Render using original-ish spacing by splitting base_text into word/non-word chunks.
-        parts = re.findall(r"[A-Za-z0-9']+|[^A-Za-z0-9']+", base_text)
+        parts = _PART_RE.findall(base_text)
         for part in parts:
             if _WORD_RE.fullmatch(part.strip()):
                 tok = normalize_for_compare(part)
                 tok = tok.strip("'")
-                present = any(v in other_set for v in token_variants(tok))
+                present = any(v in other_set for v in token_variants(tok, self.loader.language))
                 tag = "good" if present else "bad"
                 txt.insert("end", part, tag)
             else:
@@ -1,11 +1,21 @@
 import csv
 import os
 import random
+import struct
+import zlib
 import customtkinter as ctk
 import sys
 import ctypes
+from array import array
+from bisect import bisect_right
 from PIL import Image
 
+from languages import DEFAULT_LANGUAGE, get_language
+from quiz_exam import ExamSampler
+from quiz_stats import bank_name, current_stats, record_penalty_answer
+from session_recorder import record
+from virtual_list import VirtualList
+
 try:
     from app_version import __version__
 except Exception:
@@ -14,21 +24,77 @@ VERSION = __version__
 WATERMARK_TEXT = f"Build: {VERSION} \t||\t Based on ISU Communication No. 2701 (2025/26)"
 APPID = f'debnera.skating.quiz.{VERSION}'
 
+# Mock exam length when none is entered. Category weights come from the bank's "weights" entry in
+# quiz_data/disciplines.json; unlisted categories weigh their question count.
+EXAM_DEFAULT_QUESTIONS = 20
+
+# How long "CORRECT" stays up before the next question. The next question is built off-screen
+# meanwhile, so this is pure feedback time.
+FEEDBACK_MS = 700
+
 # --- Data Layer ---
+class QuestionBank:
+    # Immutable flat snapshot of a loader's questions, categories in sorted order. Quiz sessions
+    # only store positions into it, so any number of sessions share one copy of the questions.
+    # A reload builds a new bank; running sessions keep the one they started on.
+    def __init__(self, data):
+        questions = []
+        self.categories = tuple(sorted(data))
+        self.starts = []
+        for category in self.categories:
+            self.starts.append(len(questions))
+            questions.extend(data[category])
+        self.questions = tuple(questions)
+        self.starts = tuple(self.starts)
+        self._ranges = {c: range(start, start + len(data[c])) for c, start in zip(self.categories, self.starts)}
+        # Saved sessions carry this, so they're never restored against different questions.
+        self.checksum = zlib.crc32("\x1e".join(
+            f"{self.category_of(i)}\x1f{q['question']}\x1f{q['answer']}" for i, q in enumerate(self.questions)
+        ).encode("utf-8"))
+
+    def __len__(self):
+        return len(self.questions)
+
+    def __getitem__(self, position):
+        return self.questions[position]
+
+    def category_range(self, category):
+        return self._ranges.get(category, range(0))
+
+    def category_of(self, position):
+        # Empty categories share their start with the next one; bisect_right skips past them.
+        return self.categories[bisect_right(self.starts, position) - 1]
+
+    def new_order(self, positions=()):
+        # 2 bytes per question for any bank below 65536 questions.
+        return array("H" if len(self.questions) <= 0xFFFF else "I", positions)
+
+
 class QuizLoader:
-    def __init__(self, filename):
+    def __init__(self, filename, language=DEFAULT_LANGUAGE):
         self.filename = filename
+        self.language = language
         self.data = {}
         self.all_possible_answers = set()
+        self._bank = None
         self.load_data()
 
     def load_data(self):
+        parsed = self._read_rows()
+        if parsed is None:
+            return
+        self.data = parsed
+        self._rebuild_answers()
+
+    def _read_rows(self):
+        # Returns {category: [question dicts]} or None if the file could not be read.
         if not os.path.exists(self.filename):
             print(f"Error: {self.filename} not found.")
-            return
+            return None
 
+        data = {}
         try:
-            with open(self.filename, mode='r', encoding='ANSI') as f:
+            with open(self.filename, mode='r', encoding=get_language(self.language).encoding) as f:
                 reader = csv.reader(f, delimiter=';')
                 next(reader, None) # Skip header
 
@@ -38,16 +104,50 @@ class QuizLoader:
                         description = row[1].strip()
                         answer = row[2].strip()
 
-                        if category not in self.data:
-                            self.data[category] = []
+                        if category not in data:
+                            data[category] = []
 
-                        self.data[category].append({
+                        data[category].append({
                             'question': description,
                             'answer': answer
                         })
-                        self.all_possible_answers.add(answer)
         except Exception as e:
             print(f"Error reading file: {e}")
+            return None
+        return data
+
+    def _rebuild_answers(self):
+        self.all_possible_answers = {q['answer'] for questions in self.data.values() for q in questions}
+        self._bank = None  # rebuilt on next use
+
+    def bank(self):
+        if self._bank is None:
+            self._bank = QuestionBank(self.data)
+        return self._bank
+
+    def read_categories(self):
+        # Parses the file without touching the loaded data (safe to call off the UI thread).
+        return self._read_rows()
+
+    def changed_categories(self, parsed):
+        # Categories added, removed or edited in `parsed` compared to what is loaded.
+        return {c for c in self.data.keys() | parsed.keys() if self.data.get(c) != parsed.get(c)}
+
+    def apply_categories(self, parsed, categories):
+        # Swap in only the given categories (others keep their objects).
+        for category in categories:
+            if category in parsed:
+                self.data[category] = parsed[category]
+            else:
+                self.data.pop(category, None)
+        self._rebuild_answers()
+
+    def reload_categories(self, categories):
+        # Re-read the file but only swap in the given categories.
+        parsed = self._read_rows()
+        if parsed is None:
+            return
+        self.apply_categories(parsed, categories)
 
     def get_categories(self):
         return sorted(list(self.data.keys()))
@@ -60,19 +160,32 @@ class QuizLoader:
 
 # --- Logic Layer ---
 class QuizEngine:
-    def __init__(self, questions):
-        self.questions = questions
+    # One quiz session: the order of bank positions to ask plus three counters. No questions are
+    # copied, so a session costs a few bytes per question however large the bank is, and its
+    # state round-trips through to_bytes()/from_bytes().
+    STATE_VERSION = 1
+    _STATE_HEADER = struct.Struct("<BcIIII")  # version, order typecode, bank checksum, index, score, attempts
+
+    def __init__(self, bank, order):
+        self.bank = bank
+        self.order = order if isinstance(order, array) else bank.new_order(order)
         self.current_index = 0
         self.score = 0
         self.attempts_on_current = 0
 
+    def __len__(self):
+        return len(self.order)
+
     def get_current_question(self):
-        if self.current_index < len(self.questions):
-            return self.questions[self.current_index]
+        if self.current_index < len(self.order):
+            return self.bank[self.order[self.current_index]]
         return None
 
+    def current_category(self):
+        return self.bank.category_of(self.order[self.current_index])
+
     def check_answer(self, user_answer):
-        correct_answer = self.questions[self.current_index]['answer']
+        correct_answer = self.bank[self.order[self.current_index]]['answer']
         is_correct = user_answer == correct_answer
 
         if is_correct:
@@ -85,9 +198,35 @@ class QuizEngine:
             self.attempts_on_current += 1
             return False
 
+    def to_bytes(self):
+        order = self.order
+        if sys.byteorder == "big":
+            order = array(order.typecode, order)
+            order.byteswap()
+        header = self._STATE_HEADER.pack(self.STATE_VERSION, order.typecode.encode("ascii"), self.bank.checksum,
+                                         self.current_index, self.score, self.attempts_on_current)
+        return header + order.tobytes()
+
+    @classmethod
+    def from_bytes(cls, bank, state):
+        version, typecode, checksum, index, score, attempts = cls._STATE_HEADER.unpack_from(state)
+        if version != cls.STATE_VERSION:
+            raise ValueError(f"Unsupported quiz session state version: {version}")
+        if checksum != bank.checksum:
+            raise ValueError("Quiz session was saved against different questions")
+        order = array(typecode.decode("ascii"))
+        order.frombytes(state[cls._STATE_HEADER.size:])
+        if sys.byteorder == "big":
+            order.byteswap()
+        if any(p >= len(bank) for p in order) or index > len(order):
+            raise ValueError("Quiz session state does not fit the bank")
+        engine = cls(bank, order)
+        engine.current_index, engine.score, engine.attempts_on_current = index, score, attempts
+        return engine
+
 # --- UI Layer (Screen) ---
 class PenaltiesQuizScreen(ctk.CTkFrame):
-    def __init__(self, master: ctk.CTk, loader: QuizLoader, on_back):
+    def __init__(self, master: ctk.CTk, loader: QuizLoader, on_back, feedback_ms=FEEDBACK_MS, weights=None):
         super().__init__(master)
 
         # Tell Windows this is a separate application to show the taskbar icon correctly
@@ -99,6 +238,7 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
                 pass
 
         self.on_back = on_back
+        self.feedback_ms = feedback_ms
 
         # Load quiz data
         self.loader = loader
@@ -106,15 +246,27 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
         self.possible_answers = self.loader.get_all_answers()
 
         self.buttons = None
+        self._pending_next = None
+        self._prebuild_id = None
+        self._question_page = None   # frame of the question on screen
+        self._next_page = None       # (page, buttons, feedback label) built while feedback shows
+        self._watermark = None
         self.current_category_name = None
         self.feedback_label = None
+        self.exam_sampler = None
+        self.exam_weights = dict(weights or {})
+        self.exam_running = False
+
+        self.exam_count_entry = None
+        self.exam_seed_entry = None
+        self.category_list = None
 
         self.setup_category_selection()
 
 
     def draw_watermark(self):
-        ctk.CTkLabel(self, text=WATERMARK_TEXT,
-                     font=("Arial", 10), text_color="gray50").place(relx=0.98, rely=0.98, anchor="se")
+        self._watermark = ctk.CTkLabel(self, text=WATERMARK_TEXT, font=("Arial", 10), text_color="gray50")
+        self._watermark.place(relx=0.98, rely=0.98, anchor="se")
 
     def draw_logo(self):
         try:
@@ -129,8 +281,18 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
             print(f"Could not load logo: {e}")
 
     def clear_screen(self):
+        if self._prebuild_id is not None:
+            self.after_cancel(self._prebuild_id)
+            self._prebuild_id = None
         for widget in self.winfo_children():
             widget.destroy()
+        self.category_list = None
+        self._question_page = None
+        self._next_page = None
+
+    def back_to_categories(self):
+        record("categories")
+        self.setup_category_selection()
 
     def setup_category_selection(self):
         self.clear_screen()
@@ -141,23 +303,75 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
 
         ctk.CTkButton(self, text="Back to menu", command=self.on_back).pack(pady=(0, 10))
 
-        scroll_frame = ctk.CTkScrollableFrame(self, width=500, height=400)
-        scroll_frame.pack(pady=10)
-
-        for cat in self.loader.get_categories():
-            ctk.CTkButton(scroll_frame, text=cat, height=40,
-                          command=lambda c=cat: self.start_quiz(c)).pack(pady=5, fill="x", padx=20)
-
-    def start_quiz(self, category):
-        questions = self.loader.get_questions(category).copy()
-        random.shuffle(questions)
+        exam_row = ctk.CTkFrame(self, fg_color="transparent")
+        exam_row.pack(pady=(0, 10))
+        ctk.CTkLabel(exam_row, text="Mock exam:", font=("Arial", 14, "bold")).pack(side="left", padx=(0, 8))
+        self.exam_count_entry = ctk.CTkEntry(exam_row, width=60, placeholder_text=str(EXAM_DEFAULT_QUESTIONS))
+        self.exam_count_entry.pack(side="left")
+        ctk.CTkLabel(exam_row, text="questions, seed").pack(side="left", padx=6)
+        self.exam_seed_entry = ctk.CTkEntry(exam_row, width=90, placeholder_text="random")
+        self.exam_seed_entry.pack(side="left")
+        ctk.CTkButton(exam_row, text="Start exam", width=110,
+                      command=self.on_start_exam).pack(side="left", padx=(10, 0))
+
+        # Only the visible rows are built, so this stays cheap for very large banks.
+        items = [(cat, cat) for cat in self.loader.get_categories()]
+        self.category_list = VirtualList(self, items, on_pick=self.start_quiz, width=500, height=400)
+        self.category_list.pack(pady=10)
+
+    def on_bank_changed(self, loader, categories):
+        # Some categories were edited/synced. A running quiz keeps its questions; the next one sees the new data.
+        if loader is not self.loader:
+            return
+        self.possible_answers = self.loader.get_all_answers()
+        self.exam_sampler = None
+        if self.category_list is not None:
+            self.category_list.set_items([(cat, cat) for cat in self.loader.get_categories()])
+
+    def start_quiz(self, category, seed=None):
+        # The shuffle seed is recorded so a session replay sees the same question order.
+        if seed is None:
+            seed = random.randrange(2**32)
+        record("category", category=category, seed=seed)
+        # Shuffling positions, not questions: the same seed gives the same order as before.
+        bank = self.loader.bank()
+        order = bank.new_order(bank.category_range(category))
+        random.Random(seed).shuffle(order)
         self.current_category_name = category
-        self.engine = QuizEngine(questions)
+        self.exam_running = False
+        self.engine = QuizEngine(bank, order)
+        self.show_question()
+
+    def on_start_exam(self):
+        try:
+            count = int(self.exam_count_entry.get() or EXAM_DEFAULT_QUESTIONS)
+        except ValueError:
+            count = EXAM_DEFAULT_QUESTIONS
+        seed_text = self.exam_seed_entry.get().strip()
+        try:
+            seed = int(seed_text) if seed_text else random.randrange(1_000_000)
+        except ValueError:
+            seed = seed_text  # any string is a valid, reproducible seed
+        self.start_exam(count, seed)
+
+    def start_exam(self, count, seed, weights=None):
+        # Questions across all categories; the same seed always gives the same exam.
+        count = max(1, count)   # an empty exam would end before it started
+        record("exam", count=count, seed=seed)
+        if weights is not None or self.exam_sampler is None:
+            self.exam_sampler = ExamSampler(self.loader, self.exam_weights if weights is None else weights)
+        bank = self.loader.bank()
+        order = self.exam_sampler.generate_order(bank, count, seed)
+        if not order:
+            return
+        self.current_category_name = f"Mock exam (seed {seed})"
+        self.exam_running = True
+        self.engine = QuizEngine(bank, order)
         self.show_question()
 
-    def draw_buttons(self):
-        self.btn_frame = ctk.CTkFrame(self, fg_color="transparent")
-        self.btn_frame.pack(pady=10)
+    def draw_buttons(self, parent):
+        btn_frame = ctk.CTkFrame(parent, fg_color="transparent")
+        btn_frame.pack(pady=10)
         rows = {}
 
         found_ints = []
@@ -178,18 +392,20 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
         else:
             full_range_bases = sorted(rows.keys(), reverse=True)
 
-        self.buttons = {}
+        buttons = {}
         for r_idx, base in enumerate(full_range_bases):
             row_values = rows.get(base, [base])
             row_values = sorted(row_values, key=len)
 
             for c_idx, val in enumerate(row_values):
-                btn = ctk.CTkButton(self.btn_frame, text=val, width=120, height=45,
+                btn = ctk.CTkButton(btn_frame, text=val, width=120, height=45,
                                     command=lambda v=val: self.handle_press(v))
                 btn.grid(row=r_idx, column=c_idx, padx=8, pady=8)
-                self.buttons[val] = btn
+                buttons[val] = btn
+        return buttons
 
     def show_question(self):
+        # Full redraw, used for the first question of a quiz. Later ones are swapped in by advance_now().
         self.clear_screen()
         self.draw_watermark()
 
@@ -197,49 +413,106 @@ class PenaltiesQuizScreen(ctk.CTkFrame):
         if not q:
             self.show_results()
             return
+        self._show_question_page(self._build_question_page(q))
 
-        top_bar = ctk.CTkFrame(self, fg_color="transparent")
+    def _build_question_page(self, q):
+        # Builds the page for the engine's current question without showing it.
+        page = ctk.CTkFrame(self, fg_color="transparent")
+
+        top_bar = ctk.CTkFrame(page, fg_color="transparent")
         top_bar.pack(fill="x", pady=(10, 0), padx=12)
 
         ctk.CTkButton(top_bar, text="Back to menu", command=self.on_back, width=140).pack(side="left")
 
-        ctk.CTkLabel(self, text=self.current_category_name,
+        category_text = self.current_category_name
+        if self.exam_running:
+            category_text = f"{self.current_category_name} · {self.engine.current_category()}"
+        ctk.CTkLabel(page, text=category_text,
                      font=("Arial", 16, "italic"), text_color="gray").pack(pady=(10, 0))
 
-        progress = f"Question {self.engine.current_index + 1} of {len(self.engine.questions)}"
-        ctk.CTkLabel(self, text=progress, font=("Arial", 12)).pack(pady=5)
+        progress = f"Question {self.engine.current_index + 1} of {len(self.engine)}"
+        ctk.CTkLabel(page, text=progress, font=("Arial", 12)).pack(pady=5)
 
-        question_label = ctk.CTkLabel(self, text=q['question'], font=("Arial", 20, "bold"), wraplength=700)
+        question_label = ctk.CTkLabel(page, text=q['question'], font=("Arial", 20, "bold"), wraplength=700)
         question_label.pack(pady=30)
 
-        self.draw_buttons()
+        buttons = self.draw_buttons(page)
+
+        feedback_label = ctk.CTkLabel(page, text="", font=("Arial", 18, "bold"))
+        feedback_label.pack(pady=30)
+        return page, buttons, feedback_label
 
-        self.feedback_label = ctk.CTkLabel(self, text="", font=("Arial", 18, "bold"))
-        self.feedback_label.pack(pady=30)
+    def _show_question_page(self, built):
+        # Old page out, new page in, within one event: Tk only redraws once, at idle.
+        page, self.buttons, self.feedback_label = built
+        if self._question_page is not None:
+            self._question_page.destroy()
+        self._question_page = page
+        page.pack(fill="both", expand=True)
+        self._watermark.lift()
+
+    def _prebuild_next(self):
+        # Idle time while "CORRECT" is showing (the engine has already moved on to the next question).
+        self._prebuild_id = None
+        q = self.engine.get_current_question()
+        if q is not None:
+            self._next_page = self._build_question_page(q)
 
     def handle_press(self, choice):
-        is_correct = self.engine.check_answer(choice)
+        record("answer", choice=choice)
+        engine = self.engine
+        position, wrong_so_far = engine.order[engine.current_index], engine.attempts_on_current
+        is_correct = engine.check_answer(choice)
 
         if is_correct:
+            record_penalty_answer(self.loader, engine.bank.category_of(position),
+                                  engine.bank[position]['question'], wrong_so_far)
             self.feedback_label.configure(text="CORRECT", text_color="#4CAF50")
             for btn in self.buttons.values():
                 btn.configure(state="disabled")
             self.buttons[choice].configure(fg_color="#4CAF50")
-            self.after(700, self.show_question)
+            self._pending_next = self.after(self.feedback_ms, self.advance_now)
+            self._prebuild_id = self.after_idle(self._prebuild_next)
         else:
             self.feedback_label.configure(text="WRONG", text_color="#F44336")
             self.buttons[choice].configure(fg_color="#F44336", state="disabled")
 
+    def advance_now(self):
+        # Show the next question immediately (also used by session replays to skip the feedback delay).
+        if self._pending_next is not None:
+            self.after_cancel(self._pending_next)
+            self._pending_next = None
+        if self._prebuild_id is not None:
+            self.after_cancel(self._prebuild_id)
+            self._prebuild_id = None
+        if self._next_page is None:
+            self.show_question()
+            return
+        built, self._next_page = self._next_page, None
+        self._show_question_page(built)
+
     def show_results(self):
         self.clear_screen()
         self.draw_watermark()
         self.draw_logo()
 
         ctk.CTkLabel(self, text="Quiz Results", font=("Arial", 32, "bold")).pack(pady=50)
-        score_msg = f"Points: {self.engine.score} / {len(self.engine.questions)}"
+        score_msg = f"Points: {self.engine.score} / {len(self.engine)}"
         ctk.CTkLabel(self, text=score_msg, font=("Arial", 24)).pack(pady=20)
-
-        ctk.CTkButton(self, text="Back to Categories", command=self.setup_category_selection).pack(pady=10)
+        retried = len(self.engine) - self.engine.score
+        ctk.CTkLabel(self, text=f"Right on the first try: {self.engine.score}  ·  after a retry: {retried}",
+                     font=("Arial", 16), text_color="gray80").pack(pady=(0, 10))
+
+        stats = current_stats()
+        lifetime = None
+        if stats is not None and not self.exam_running:
+            lifetime = stats.penalty_categories.get((bank_name(self.loader), self.current_category_name))
+        if lifetime is not None:
+            ctk.CTkLabel(self, text=f"All time in {self.current_category_name}: {lifetime.accuracy:.0%} right on "
+                                    f"the first try over {lifetime.asked} questions",
+                         font=("Arial", 14), text_color="gray70").pack(pady=(0, 20))
+
+        ctk.CTkButton(self, text="Back to Categories", command=self.back_to_categories).pack(pady=10)
         ctk.CTkButton(self, text="Back to menu", command=self.on_back).pack(pady=10)
 
 
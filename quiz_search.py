@@ -0,0 +1,303 @@
+import heapq
+import re
+import time
+import tkinter as tk
+import customtkinter as ctk
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+from languages import DEFAULT_LANGUAGE, get_language
+from quiz_penalties import QuizLoader
+from quiz_goe_plus_bullets import RecallQuizLoader, analyze, token_variants
+
+from session_recorder import record
+
+try:
+    from app_version import __version__
+except Exception:
+    __version__ = "0.0.0+unknown"
+
+VERSION = __version__
+WATERMARK_TEXT = f"Build: {VERSION} \t||\t Rule search"
+
+# ----------------------------
+# Data model / index
+# ----------------------------
+
+_PART_RE = re.compile(r"[\w']+|[^\w']+")   # words and the gaps between them, for highlighting
+
+@dataclass(frozen=True)
+class SearchDoc:
+    kind: str                # "penalty" or "goe"
+    bank: str                # e.g. "pair"
+    category: str
+    text: str                # question / description
+    answer: str = ""         # penalty points (empty for GOE bullets)
+
+
+@dataclass
+class SearchHit:
+    doc: SearchDoc
+    score: float
+    matched: Set[str]        # normalized tokens of doc.text that matched the query
+    doc_id: int = -1         # position in SearchIndex.docs
+
+
+class SearchIndex:
+    # Token + prefix index over every penalty question and GOE description, built once at load.
+    #
+    # Every query token except the last must match a word (plural-tolerant); the last one is
+    # treated as a prefix (the user is still typing it). Prefix lookup is a binary search over
+    # the sorted vocabulary, so no keystroke ever rescans the documents. A one-letter prefix
+    # would pull in a large share of the vocabulary and its postings, so prefixes only expand
+    # from MIN_PREFIX_LEN characters on, and to at most MAX_PREFIX_TERMS words.
+    #
+    # Stop words (per language) and words that appear nowhere in the index are ignored, so
+    # natural questions like "penalty for touch down in lifts" still find something.
+    EXACT_WEIGHT = 2.0
+    PREFIX_WEIGHT = 1.0
+    CATEGORY_WEIGHT = 0.5
+    MIN_PREFIX_LEN = 2
+    MAX_PREFIX_TERMS = 64
+
+    def __init__(self, language: str = DEFAULT_LANGUAGE):
+        self.language = language
+        self.stop_words = get_language(language).stop_words
+        self.docs: List[SearchDoc] = []
+        self.postings: Dict[str, Set[int]] = {}
+        self.vocab: List[str] = []
+        # Category words are searchable too ("touch down lifts"), but weigh less than the text.
+        self.category_postings: Dict[str, Set[int]] = {}
+        self.category_vocab: List[str] = []
+        self.doc_lengths: List[int] = []
+        self._doc_order: List[int] = []
+        self._highlight_parts: Dict[int, Tuple[Tuple[str, FrozenSet[str]], ...]] = {}
+
+    @classmethod
+    def from_loaders(cls, penalty_loaders: Dict[str, QuizLoader],
+                     recall_loaders: Dict[str, RecallQuizLoader],
+                     language: str = DEFAULT_LANGUAGE) -> "SearchIndex":
+        index = cls(language)
+        for bank, loader in penalty_loaders.items():
+            for cat in loader.get_categories():
+                for q in loader.get_questions(cat):
+                    index.add(SearchDoc("penalty", bank, cat, q['question'], q['answer']))
+        for bank, loader in recall_loaders.items():
+            for cat in loader.get_categories():
+                # Bullets shared by several sets of a category are one hit, not one per set.
+                seen: Set[str] = set()
+                for item_set in loader.get_sets_for_category(cat):
+                    for desc in item_set.descriptions:
+                        norm = analyze(desc, language).norm
+                        if norm not in seen:
+                            seen.add(norm)
+                            index.add(SearchDoc("goe", bank, cat, desc))
+        index.finalize()
+        return index
+
+    def add(self, doc: SearchDoc) -> None:
+        doc_id = len(self.docs)
+        self.docs.append(doc)
+        analysis = analyze(doc.text, self.language)
+        self.doc_lengths.append(len(analysis.tokens))
+        for v in analysis.variants:
+            self.postings.setdefault(v, set()).add(doc_id)
+        for v in analyze(doc.category, self.language).variants:
+            self.category_postings.setdefault(v, set()).add(doc_id)
+
+    def finalize(self) -> None:
+        self.vocab = sorted(self.postings)
+        self.category_vocab = sorted(self.category_postings)
+        # Tie-break for equal scores: shorter docs first, then index order.
+        self._doc_order = [0] * len(self.docs)
+        by_length = sorted(range(len(self.docs)), key=lambda d: (self.doc_lengths[d], d))
+        for rank, d in enumerate(by_length):
+            self._doc_order[d] = rank
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    @classmethod
+    def _prefix_tokens(cls, vocab: List[str], prefix: str) -> List[str]:
+        out: List[str] = []
+        if len(prefix) < cls.MIN_PREFIX_LEN:
+            return out
+        i = bisect_left(vocab, prefix)
+        while i < len(vocab) and vocab[i].startswith(prefix) and len(out) < cls.MAX_PREFIX_TERMS:
+            out.append(vocab[i])
+            i += 1
+        return out
+
+    def _term_matches(self, tok: str, is_prefix: bool) -> Tuple[Dict[int, float], Set[str]]:
+        # {doc_id: score} for one query term, plus the vocabulary words that matched it.
+        scores: Dict[int, float] = {}
+        words: Set[str] = set()
+        if is_prefix:
+            for word in self._prefix_tokens(self.vocab, tok):
+                words.add(word)
+                scores.update(dict.fromkeys(self.postings[word], self.PREFIX_WEIGHT))
+        # Exact (plural-tolerant) matches outrank the prefix ones.
+        for v in token_variants(tok, self.language):
+            if v in self.postings:
+                words.add(v)
+                scores.update(dict.fromkeys(self.postings[v], self.EXACT_WEIGHT))
+
+        cat_words = set(token_variants(tok, self.language))
+        if is_prefix:
+            cat_words.update(self._prefix_tokens(self.category_vocab, tok))
+        cat_docs: Set[int] = set()
+        for word in cat_words:
+            cat_docs.update(self.category_postings.get(word, ()))
+        # Whole categories can match ("lift"), so add their weight in bulk.
+        for doc_id in cat_docs & scores.keys():
+            scores[doc_id] += self.CATEGORY_WEIGHT
+        scores.update(dict.fromkeys(cat_docs - scores.keys(), self.CATEGORY_WEIGHT))
+        return scores, words
+
+    def search(self, query: str, limit: int = 50) -> List[SearchHit]:
+        q_toks = list(analyze(query, self.language).tokens)
+        if not q_toks:
+            return []
+        # A trailing space means the last word is finished.
+        last_is_prefix = not query.endswith(" ")
+
+        per_term = []
+        for i, tok in enumerate(q_toks):
+            is_last = i == len(q_toks) - 1
+            if tok in self.stop_words and not (is_last and last_is_prefix):
+                continue
+            scores, words = self._term_matches(tok, is_prefix=is_last and last_is_prefix)
+            if scores:
+                per_term.append((scores, words))
+        if not per_term:
+            return []
+
+        # AND semantics: start from the rarest term, summing scores as the candidates shrink.
+        per_term.sort(key=lambda t: len(t[0]))
+        totals = per_term[0][0]
+        for scores, _ in per_term[1:]:
+            totals = {d: total + scores[d] for d, total in totals.items() if d in scores}
+            if not totals:
+                return []
+
+        matched_words: Set[str] = set()
+        for _, words in per_term:
+            matched_words |= words
+
+        # Only the top `limit` are ranked, every keystroke must fit in a frame. Totals take a
+        # handful of distinct values, so go tier by tier, shortest docs first within a tier.
+        top: List[int] = []
+        for tier in sorted(set(totals.values()), reverse=True):
+            docs = [d for d, total in totals.items() if total == tier]
+            top += heapq.nsmallest(limit - len(top), docs, key=self._doc_order.__getitem__)
+            if len(top) >= limit:
+                break
+        return [SearchHit(doc=self.docs[d], score=totals[d], matched=matched_words, doc_id=d) for d in top]
+
+    def highlight_parts(self, doc_id: int) -> Tuple[Tuple[str, FrozenSet[str]], ...]:
+        # The doc's text split into words and gaps, each with its normalized variants (empty for
+        # gaps). Computed when a doc is first shown, so refreshing results doesn't re-analyze.
+        parts = self._highlight_parts.get(doc_id)
+        if parts is None:
+            out = []
+            for part in _PART_RE.findall(self.docs[doc_id].text):
+                tok = analyze(part, self.language).norm.strip("'")
+                out.append((part, frozenset(token_variants(tok, self.language)) if tok else frozenset()))
+            parts = self._highlight_parts[doc_id] = tuple(out)
+        return parts
+
+
+# ----------------------------
+# UI (Screen)
+# ----------------------------
+
+class SearchScreen(ctk.CTkFrame):
+    def __init__(self, master: ctk.CTk, penalty_loaders: Dict[str, QuizLoader],
+                 recall_loaders: Dict[str, RecallQuizLoader], on_back,
+                 language: str = DEFAULT_LANGUAGE, index: Optional[SearchIndex] = None):
+        super().__init__(master)
+        self.on_back = on_back
+        self.penalty_loaders = penalty_loaders
+        self.recall_loaders = recall_loaders
+        self.language = language
+        # The app passes an index it keeps per language, so reopening this screen doesn't rebuild it.
+        self.index = index if index is not None else SearchIndex.from_loaders(penalty_loaders, recall_loaders, language)
+        self.show_bank = len(set(penalty_loaders) | set(recall_loaders)) > 1
+
+        self.COLOR_HIT = "#FFD54F"
+        self.COLOR_PENALTY = "#F44336"
+        self.COLOR_GOE = "#4CAF50"
+
+        self._last_query: Optional[str] = None
+
+        ctk.CTkLabel(self, text=WATERMARK_TEXT, font=("Arial", 10),
+                     text_color="gray50").place(relx=0.98, rely=0.98, anchor="se")
+
+        top_bar = ctk.CTkFrame(self, fg_color="transparent")
+        top_bar.pack(fill="x", pady=(10, 0), padx=12)
+        ctk.CTkButton(top_bar, text="Back to menu", command=self.on_back, width=140).pack(side="left")
+
+        ctk.CTkLabel(self, text="Search penalties and GOE bullets",
+                     font=("Arial", 24, "bold")).pack(pady=(15, 10))
+
+        self.entry = ctk.CTkEntry(self, height=38, font=("Arial", 16),
+                                  placeholder_text="e.g. touch down free foot lift")
+        self.entry.pack(fill="x", padx=30, pady=(0, 5))
+        self.entry.bind("<KeyRelease>", lambda _e: self.refresh())
+
+        self.status_label = ctk.CTkLabel(self, text=f"{len(self.index)} entries indexed",
+                                         font=("Arial", 12), text_color="gray70")
+        self.status_label.pack(anchor="w", padx=32)
+
+        # One Text widget for all results: a keystroke rewrites its content instead of rebuilding widgets.
+        self.results = tk.Text(self, wrap="word", bg="#1f1f1f", fg="#e0e0e0", relief="flat",
+                               font=("Arial", 13), padx=10, pady=8, cursor="arrow")
+        self.results.pack(fill="both", expand=True, padx=30, pady=(5, 30))
+        self.results.tag_configure("hit", foreground=self.COLOR_HIT, font=("Arial", 13, "bold"))
+        self.results.tag_configure("meta", foreground="gray60", font=("Arial", 11))
+        self.results.tag_configure("penalty", foreground=self.COLOR_PENALTY, font=("Arial", 13, "bold"))
+        self.results.tag_configure("goe", foreground=self.COLOR_GOE, font=("Arial", 13, "bold"))
+        self.results.configure(state="disabled")
+
+        self.entry.focus_set()
+
+    def on_bank_changed(self, loader, categories: Set[str]) -> None:
+        # Rebuild from the loaded data and re-run the current query against it.
+        loaders = list(self.penalty_loaders.values()) + list(self.recall_loaders.values())
+        if any(loader is ours for ours in loaders):
+            self.index = SearchIndex.from_loaders(self.penalty_loaders, self.recall_loaders, self.language)
+            self._last_query = None
+            self.refresh()
+
+    def refresh(self) -> None:
+        query = self.entry.get()
+        if query == self._last_query:
+            return
+        self._last_query = query
+        record("search", query=query)
+
+        t0 = time.perf_counter()
+        hits = self.index.search(query)
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        txt = self.results
+        txt.configure(state="normal")
+        txt.delete("1.0", "end")
+        for hit in hits:
+            doc = hit.doc
+            where = f"{doc.category}" if not self.show_bank else f"[{doc.bank}] {doc.category}"
+            kind = "Penalty" if doc.kind == "penalty" else "GOE +"
+            txt.insert("end", kind, doc.kind)
+            txt.insert("end", f"  {where}\n", "meta")
+            for part, variants in self.index.highlight_parts(hit.doc_id):
+                txt.insert("end", part, "hit" if not variants.isdisjoint(hit.matched) else ())
+            if doc.answer:
+                txt.insert("end", f"   {doc.answer}", "penalty")
+            txt.insert("end", "\n\n")
+        txt.configure(state="disabled")
+
+        if query.strip():
+            self.status_label.configure(text=f"{len(hits)} results ({elapsed_ms:.2f} ms)")
+        else:
+            self.status_label.configure(text=f"{len(self.index)} entries indexed")
@@ -0,0 +1,369 @@
+import heapq
+import os
+import struct
+import zlib
+import customtkinter as ctk
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from languages import localized_path
+
+# Lifetime answer statistics: the dashboard screen and the per-run summaries.
+#
+# Every answer event updates a few running aggregates in place (counters and running means), so
+# recording is O(1) and nothing ever walks an answer history. The dashboard ranks one aggregate
+# per question / bullet, so it costs the same after ten answers or ten thousand.
+#
+#   penalties: per question and per category - times asked, right on the first press, wrong presses
+#              (from QuizEngine.attempts_on_current when the question is finally answered)
+#   recall:    per bullet and per category - running mean similarity on the first Check of a set,
+#              and separately on the re-checks after corrections
+#
+# Saved to <user data dir>/stats.bin (SKATING_QUIZ_STATS=<path> to override) as a zlib-compressed
+# string table plus fixed-size records: a few KB for a whole bank.
+
+STATS_FILE = "stats.bin"
+STATS_VERSION = 1
+DASHBOARD_ROWS = 15
+
+_MAGIC = b"SQST"
+_HEADER = struct.Struct("<4sBI")      # magic, version, crc32 of the compressed payload
+_COUNT = struct.Struct("<I")
+_STR_LEN = struct.Struct("<H")
+_ANSWER = struct.Struct("<3I3I")      # bank, category, question ids; asked, first_try, wrong
+_SIMILARITY = struct.Struct("<3IIfIf")  # bank, category, bullet ids; count, mean, retry_count, retry_mean
+_CATEGORY = ""                        # item id of a category's own aggregate in the file
+
+# ----------------------------
+# Aggregates
+# ----------------------------
+
+@dataclass
+class AnswerTally:
+    asked: int = 0        # questions answered (eventually correctly)
+    first_try: int = 0    # ... with the first press
+    wrong: int = 0        # wrong presses along the way
+
+    def add(self, wrong: int) -> None:
+        self.asked += 1
+        self.first_try += wrong == 0
+        self.wrong += wrong
+
+    @property
+    def retried(self) -> int:
+        return self.asked - self.first_try
+
+    @property
+    def accuracy(self) -> float:
+        return self.first_try / self.asked if self.asked else 0.0
+
+    def weakness(self) -> float:
+        # Miss rate with one imaginary hit and miss added, so one unlucky answer doesn't
+        # outrank a question that keeps being missed.
+        return (self.retried + 1) / (self.asked + 2)
+
+
+@dataclass
+class SimilarityTally:
+    count: int = 0          # first Checks of a set
+    mean: float = 0.0
+    retry_count: int = 0    # Checks after corrections
+    retry_mean: float = 0.0
+
+    def add(self, sim: float, retry: bool) -> None:
+        if retry:
+            self.retry_count += 1
+            self.retry_mean += (sim - self.retry_mean) / self.retry_count
+        else:
+            self.count += 1
+            self.mean += (sim - self.mean) / self.count
+
+    def weakness(self) -> float:
+        # 1 - mean similarity, pulled towards 0.5 by one imaginary average answer.
+        return 1.0 - (self.mean * self.count + 0.5) / (self.count + 1)
+
+
+def _merge_answers(tallies: Iterable[AnswerTally]) -> AnswerTally:
+    total = AnswerTally()
+    for t in tallies:
+        total.asked += t.asked
+        total.first_try += t.first_try
+        total.wrong += t.wrong
+    return total
+
+
+def _merge_similarities(tallies: Iterable[SimilarityTally]) -> SimilarityTally:
+    total = SimilarityTally()
+    for t in tallies:
+        if t.count:
+            total.mean += (t.mean - total.mean) * t.count / (total.count + t.count)
+            total.count += t.count
+        if t.retry_count:
+            total.retry_mean += (t.retry_mean - total.retry_mean) * t.retry_count / (total.retry_count + t.retry_count)
+            total.retry_count += t.retry_count
+    return total
+
+
+class StatsStore:
+    def __init__(self, path: str = ""):
+        self.path = path    # "" keeps the statistics in memory only (replays, soak tests)
+        self.questions: Dict[Tuple[str, str, str], AnswerTally] = {}
+        self.penalty_categories: Dict[Tuple[str, str], AnswerTally] = {}
+        self.bullets: Dict[Tuple[str, str, str], SimilarityTally] = {}
+        self.recall_categories: Dict[Tuple[str, str], SimilarityTally] = {}
+        self.dirty = False
+
+    def is_empty(self) -> bool:
+        return not self.penalty_categories and not self.recall_categories
+
+    def record_penalty(self, bank: str, category: str, question: str, wrong: int) -> None:
+        self.questions.setdefault((bank, category, question), AnswerTally()).add(wrong)
+        self.penalty_categories.setdefault((bank, category), AnswerTally()).add(wrong)
+        self.dirty = True
+
+    def record_recall(self, bank: str, category: str, bullet_sims: Iterable[Tuple[str, float]],
+                      retry: bool) -> None:
+        # One Check of a set: a sample per bullet, and their mean as one sample for the category.
+        sims = []
+        for bullet, sim in bullet_sims:
+            self.bullets.setdefault((bank, category, bullet), SimilarityTally()).add(sim, retry)
+            sims.append(sim)
+        if sims:
+            self.recall_categories.setdefault((bank, category), SimilarityTally()).add(sum(sims) / len(sims), retry)
+            self.dirty = True
+
+    def penalty_total(self) -> AnswerTally:
+        return _merge_answers(self.penalty_categories.values())
+
+    def recall_total(self) -> SimilarityTally:
+        return _merge_similarities(self.recall_categories.values())
+
+    def weakest_questions(self, n: int = DASHBOARD_ROWS) -> List[Tuple[Tuple[str, str, str], AnswerTally]]:
+        # Only questions that were missed at least once; never-missed ones aren't weak spots.
+        missed = ((key, t) for key, t in self.questions.items() if t.retried)
+        return heapq.nlargest(n, missed, key=lambda kv: kv[1].weakness())
+
+    def weakest_bullets(self, n: int = DASHBOARD_ROWS) -> List[Tuple[Tuple[str, str, str], SimilarityTally]]:
+        graded = ((key, t) for key, t in self.bullets.items() if t.count)
+        return heapq.nlargest(n, graded, key=lambda kv: kv[1].weakness())
+
+    def weakest_categories(self, n: int = DASHBOARD_ROWS) -> List[Tuple[str, Tuple[str, str], float, str]]:
+        # (mode, key, score, detail) over both modes, weakest first.
+        rows = [(t.weakness(), "penalties", key, t.accuracy, f"first try, {t.asked} questions")
+                for key, t in self.penalty_categories.items()]
+        rows += [(t.weakness(), "recall", key, t.mean, f"similarity, {t.count} checks")
+                 for key, t in self.recall_categories.items() if t.count]
+        return [row[1:] for row in heapq.nlargest(n, rows, key=lambda row: row[0])]
+
+    # ----------------------------
+    # Persistence
+    # ----------------------------
+
+    def to_bytes(self) -> bytes:
+        strings: Dict[str, int] = {}
+
+        def sid(s: str) -> int:
+            return strings.setdefault(s, len(strings))
+
+        answers = [_ANSWER.pack(sid(b), sid(c), sid(q), t.asked, t.first_try, t.wrong)
+                   for (b, c, q), t in self.questions.items()]
+        answers += [_ANSWER.pack(sid(b), sid(c), sid(_CATEGORY), t.asked, t.first_try, t.wrong)
+                    for (b, c), t in self.penalty_categories.items()]
+        sims = [_SIMILARITY.pack(sid(b), sid(c), sid(d), t.count, t.mean, t.retry_count, t.retry_mean)
+                for (b, c, d), t in self.bullets.items()]
+        sims += [_SIMILARITY.pack(sid(b), sid(c), sid(_CATEGORY), t.count, t.mean, t.retry_count, t.retry_mean)
+                 for (b, c), t in self.recall_categories.items()]
+
+        parts = [_COUNT.pack(len(strings))]
+        for s in strings:
+            raw = s.encode("utf-8")
+            parts.append(_STR_LEN.pack(len(raw)) + raw)
+        for records in (answers, sims):
+            parts.append(_COUNT.pack(len(records)))
+            parts.extend(records)
+        payload = zlib.compress(b"".join(parts), 9)
+        return _HEADER.pack(_MAGIC, STATS_VERSION, zlib.crc32(payload)) + payload
+
+    @classmethod
+    def from_bytes(cls, data: bytes, path: str = "") -> "StatsStore":
+        magic, version, crc = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("Not a statistics file")
+        if version != STATS_VERSION:
+            raise ValueError(f"Unsupported statistics version: {version}")
+        payload = data[_HEADER.size:]
+        if zlib.crc32(payload) != crc:
+            raise ValueError("Statistics file is corrupt")
+        raw = zlib.decompress(payload)
+
+        pos = 0
+
+        def read(st: struct.Struct) -> tuple:
+            nonlocal pos
+            out = st.unpack_from(raw, pos)
+            pos += st.size
+            return out
+
+        strings = []
+        for _ in range(read(_COUNT)[0]):
+            (length,) = read(_STR_LEN)
+            strings.append(raw[pos:pos + length].decode("utf-8"))
+            pos += length
+
+        store = cls(path)
+        for _ in range(read(_COUNT)[0]):
+            b, c, q, asked, first_try, wrong = read(_ANSWER)
+            tally = AnswerTally(asked, first_try, wrong)
+            if strings[q] == _CATEGORY:
+                store.penalty_categories[(strings[b], strings[c])] = tally
+            else:
+                store.questions[(strings[b], strings[c], strings[q])] = tally
+        for _ in range(read(_COUNT)[0]):
+            b, c, d, count, mean, retry_count, retry_mean = read(_SIMILARITY)
+            tally = SimilarityTally(count, mean, retry_count, retry_mean)
+            if strings[d] == _CATEGORY:
+                store.recall_categories[(strings[b], strings[c])] = tally
+            else:
+                store.bullets[(strings[b], strings[c], strings[d])] = tally
+        return store
+
+    @classmethod
+    def load(cls, path: str) -> "StatsStore":
+        # A missing or unreadable file starts fresh statistics (the broken file is replaced on save).
+        if not path:
+            return cls()
+        try:
+            with open(path, "rb") as f:
+                return cls.from_bytes(f.read(), path)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Could not read statistics from {path}: {e}")
+        return cls(path)
+
+    def save(self) -> None:
+        if not self.path or not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(self.to_bytes())
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except OSError as e:
+            print(f"Could not save statistics to {self.path}: {e}")
+
+
+# Screens record through these; without an open store (standalone screen runners) they're no-ops.
+_store: Optional[StatsStore] = None
+
+
+def open_stats(path: str) -> StatsStore:
+    global _store
+    _store = StatsStore.load(path)
+    return _store
+
+
+def current_stats() -> Optional[StatsStore]:
+    return _store
+
+
+def bank_name(loader) -> str:
+    # Stable across installs (the bundle path isn't): "pair-skating-minus.csv", "fi/pair-skating-minus.csv".
+    return localized_path(os.path.basename(loader.filename), loader.language)
+
+
+def record_penalty_answer(loader, category: str, question: str, wrong: int) -> None:
+    if _store is not None:
+        _store.record_penalty(bank_name(loader), category, question, wrong)
+
+
+def record_recall_check(loader, category: str, bullet_sims: Iterable[Tuple[str, float]], retry: bool) -> None:
+    if _store is not None:
+        _store.record_recall(bank_name(loader), category, bullet_sims, retry)
+
+
+# ----------------------------
+# UI (Screen)
+# ----------------------------
+
+class StatsScreen(ctk.CTkFrame):
+    # Weak-spot dashboard. Everything shown comes straight from the aggregates, so it opens
+    # instantly however many answers have been recorded.
+    COLOR_BAD = "#F44336"
+    COLOR_MID = "#FF9800"
+    COLOR_OK = "#4CAF50"
+
+    def __init__(self, master: ctk.CTk, stats: Optional[StatsStore], on_back):
+        super().__init__(master)
+        self.on_back = on_back
+        self.stats = stats
+
+        top_bar = ctk.CTkFrame(self, fg_color="transparent")
+        top_bar.pack(fill="x", pady=(10, 0), padx=12)
+        ctk.CTkButton(top_bar, text="Back to menu", command=on_back, width=140).pack(side="left")
+
+        ctk.CTkLabel(self, text="Statistics", font=("Arial", 24, "bold")).pack(pady=(15, 5))
+
+        if stats is None or stats.is_empty():
+            ctk.CTkLabel(self, text="No answers recorded yet.", font=("Arial", 14),
+                         text_color="gray80").pack(pady=20)
+            return
+
+        ctk.CTkLabel(self, text=self._summary_text(stats), font=("Arial", 14), text_color="gray80",
+                     justify="left").pack(pady=(0, 10))
+
+        body = ctk.CTkScrollableFrame(self)
+        body.pack(fill="both", expand=True, padx=30, pady=(0, 30))
+        # Bank names only matter when there's more than one (or more than one language).
+        banks = {bank for bank, _ in stats.penalty_categories} | {bank for bank, _ in stats.recall_categories}
+        self._show_bank = len(banks) > 1
+
+        self._section(body, "Weakest categories")
+        for mode, (bank, category), score, detail in stats.weakest_categories():
+            self._row(body, score, f"{self._where(bank, category)} ({mode})", detail)
+
+        self._section(body, "Most missed penalty questions")
+        for (bank, category, question), t in stats.weakest_questions():
+            self._row(body, t.accuracy, f"{self._where(bank, category)}: {question}",
+                      f"missed {t.retried} of {t.asked}, {t.wrong} wrong presses")
+
+        self._section(body, "Weakest GOE bullets")
+        for (bank, category, bullet), t in stats.weakest_bullets():
+            detail = f"{t.mean:.0%} over {t.count}"
+            if t.retry_count:
+                detail += f", {t.retry_mean:.0%} on re-checks"
+            self._row(body, t.mean, f"{self._where(bank, category)}: {bullet}", detail)
+
+    @staticmethod
+    def _summary_text(stats: StatsStore) -> str:
+        lines = []
+        penalties = stats.penalty_total()
+        if penalties.asked:
+            lines.append(f"Penalties: {penalties.asked} questions, {penalties.accuracy:.0%} right on the first try "
+                         f"({penalties.retried} after a retry, {penalties.wrong} wrong presses)")
+        recall = stats.recall_total()
+        if recall.count or recall.retry_count:
+            line = f"Recall: {recall.count} sets checked, {recall.mean:.0%} mean similarity on the first check"
+            if recall.retry_count:
+                line += f" ({recall.retry_mean:.0%} on {recall.retry_count} re-checks)"
+            lines.append(line)
+        return "\n".join(lines)
+
+    def _where(self, bank: str, category: str) -> str:
+        return f"[{bank}] {category}" if self._show_bank else category
+
+    def _section(self, parent, title: str) -> None:
+        ctk.CTkLabel(parent, text=title, font=("Arial", 16, "bold")).pack(anchor="w", padx=10, pady=(14, 4))
+
+    def _row(self, parent, score: float, text: str, detail: str) -> None:
+        color = self.COLOR_OK if score >= 0.8 else self.COLOR_MID if score >= 0.5 else self.COLOR_BAD
+        row = ctk.CTkFrame(parent, fg_color="transparent")
+        row.pack(fill="x", padx=10, pady=2)
+        ctk.CTkLabel(row, text=f"{score:.0%}", width=60, anchor="w", text_color=color,
+                     font=("Arial", 13, "bold")).pack(side="left")
+        ctk.CTkLabel(row, text=text, anchor="w", justify="left", wraplength=760,
+                     font=("Arial", 13)).pack(side="left", fill="x", expand=True)
+        ctk.CTkLabel(row, text=detail, anchor="e", font=("Arial", 12),
+                     text_color="gray60").pack(side="right")
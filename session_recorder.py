@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Opt-in recording of high-level UI actions, one JSON object per line:
+#     {"t": 1.234, "action": "route", "discipline": "pair", "mode": "penalties"}
+#
+# Enabled with SKATING_QUIZ_RECORD=<path> (or --record <path>). Screens call record(...) at
+# the points a user acts (route/category picks, answers, Check presses, ...); when no session
+# is being recorded that's a no-op. tools/replay_session.py drives the app through a recording
+# and times every step.
+
+SESSION_FORMAT = 1
+
+
+class SessionRecorder:
+    def __init__(self, path: str, metadata: Optional[Dict[str, Any]] = None):
+        self.path = path
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8")
+        header = {"t": 0.0, "action": "session", "format": SESSION_FORMAT,
+                  "started": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        header.update(metadata or {})
+        self._write(header)
+
+    def _write(self, event: Dict[str, Any]) -> None:
+        with self._lock:
+            self._file.write(json.dumps(event, ensure_ascii=False) + "\n")
+            self._file.flush()
+
+    def record(self, action: str, **data: Any) -> None:
+        event = {"t": round(time.perf_counter() - self._t0, 4), "action": action}
+        event.update(data)
+        self._write(event)
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+_recorder: Optional[SessionRecorder] = None
+
+
+def start_recording(path: str, **metadata: Any) -> SessionRecorder:
+    global _recorder
+    stop_recording()
+    _recorder = SessionRecorder(path, metadata)
+    return _recorder
+
+
+def stop_recording() -> None:
+    global _recorder
+    if _recorder is not None:
+        _recorder.close()
+        _recorder = None
+
+
+def is_recording() -> bool:
+    return _recorder is not None
+
+
+def record(action: str, **data: Any) -> None:
+    if _recorder is not None:
+        _recorder.record(action, **data)
+
+
+def load_session(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    if not events or events[0].get("action") != "session":
+        raise ValueError(f"{path} is not a recorded session")
+    if events[0].get("format") != SESSION_FORMAT:
+        raise ValueError(f"Unsupported session format: {events[0].get('format')}")
+    return events
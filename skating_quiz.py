@@ -1,10 +1,23 @@
 import os
+import sys
+
+if __name__ == "__main__":
+    # A downloaded update that didn't get installed when the app last closed is swapped in before
+    # the rest of the app is imported; if it was, the app restarts on the new files.
+    from app_updater import finish_pending_update
+    finish_pending_update(relaunch=True)
+
 import ctypes
 import customtkinter as ctk
 
-from quiz_penalties import QuizLoader, PenaltiesQuizScreen, resource_path as quiz_resource_path
-from quiz_goe_plus_bullets import RecallQuizLoader, RecallQuizScreen, resource_path as recall_resource_path
 from version_update_checker import check_and_prompt_update_async
+from app_updater import finish_pending_update, install_dir, stage_app_update_async
+from data_pack_updater import data_file_path, discard_stale_packs, sync_data_packs_async, user_data_dir
+from bank_watcher import BankWatcher
+from discipline_registry import BANK_FAILED, BANK_PENDING, BankLoadError, DisciplineRegistry
+from diagnostics import LeakTracker
+from quiz_stats import STATS_FILE, StatsScreen, open_stats
+from session_recorder import record, start_recording
 
 try:
     from app_version import __version__
@@ -16,10 +29,36 @@ APPID = f'debnera.skating.quiz.{VERSION}'
 GITHUB_OWNER = "debnera"
 GITHUB_REPO = "isu-quiz"
 
+# Mirror for delta app updates (see tools/build_update.py). Without it (or when running from source)
+# the update check only points to the releases page.
+APP_UPDATE_URL = os.environ.get("SKATING_QUIZ_UPDATE_URL", "")
+
+# Mirror for incremental quiz_data updates (see tools/build_data_pack.py). Sync is off when unset.
+DATA_PACK_URL = os.environ.get("SKATING_QUIZ_DATA_URL", "")
+
+# Long-session memory/widget-leak sampling (see diagnostics.py).
+DIAGNOSTICS = os.environ.get("SKATING_QUIZ_DIAGNOSTICS") == "1" or "--diagnostics" in sys.argv
+
+# Reload bank CSVs when they are edited on disk (see bank_watcher.py).
+WATCH = os.environ.get("SKATING_QUIZ_WATCH") == "1" or "--watch" in sys.argv
+
+# UI session recording for reproducible replays (see session_recorder.py, tools/replay_session.py).
+RECORD_PATH = os.environ.get("SKATING_QUIZ_RECORD", "")
+if "--record" in sys.argv[:-1]:
+    RECORD_PATH = sys.argv[sys.argv.index("--record") + 1]
+
+# Lifetime answer statistics (see quiz_stats.py); "" keeps them in memory only.
+STATS_PATH = os.environ.get("SKATING_QUIZ_STATS", str(user_data_dir() / STATS_FILE))
+
 
 class SkatingApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, diagnostics: bool = DIAGNOSTICS, check_updates: bool = True, record_path: str = RECORD_PATH,
+                 watch: bool = WATCH, stats_path: str = STATS_PATH):
         super().__init__()
+        if record_path:
+            start_recording(record_path, version=VERSION)
+        self.stats = open_stats(stats_path)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
 
         if os.name == "nt":
             ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(APPID)
@@ -29,51 +68,137 @@ class SkatingApp(ctk.CTk):
         self.geometry("1300x1200")
 
         self._current_screen: ctk.CTkFrame | None = None
+        # Routes come from quiz_data/disciplines.json; banks are preloaded in the background once
+        # the menu is up (a route opened before its bank is ready waits for that one load).
+        # Banks synced under an older app version would hide the newer banks bundled with this one.
+        discard_stale_packs(VERSION)
+        self.registry = DisciplineRegistry.from_manifest()
+        self.leak_tracker: LeakTracker | None = None
+        if diagnostics:
+            self.leak_tracker = LeakTracker(self)
+            self.leak_tracker.start()
         self.show_main_menu()
-        check_and_prompt_update_async(self, GITHUB_OWNER, GITHUB_REPO, VERSION)
+        # Idle callbacks run after the pending redraws, so the menu is on screen before any parsing starts.
+        self.after_idle(self._preload)
+        self.bank_watcher: BankWatcher | None = None
+        if watch:
+            self.bank_watcher = BankWatcher(self, self.registry, self.on_banks_changed, self.on_bank_status)
+            self.bank_watcher.start()
+        if check_updates:
+            if APP_UPDATE_URL and install_dir() is not None:
+                stage_app_update_async(self, APP_UPDATE_URL, VERSION)
+            else:
+                check_and_prompt_update_async(self, GITHUB_OWNER, GITHUB_REPO, VERSION)
+            if DATA_PACK_URL:
+                sync_data_packs_async(self, DATA_PACK_URL, self.registry.all_data_files(), self.on_data_updated,
+                                      app_version=VERSION)
+
 
+    def _on_close(self) -> None:
+        self.stats.save()
+        self.destroy()
 
     def _set_screen(self, screen: ctk.CTkFrame) -> None:
         if self._current_screen is not None:
             self._current_screen.destroy()
         self._current_screen = screen
         self._current_screen.pack(fill="both", expand=True)
+        if self.leak_tracker is not None:
+            self.leak_tracker.on_transition(type(screen).__name__)
 
-    def show_main_menu(self) -> None:
-        self._set_screen(MainMenuScreen(self, on_pick=self.start_route))
+    def on_data_updated(self, changed: dict[str, set[str]]) -> None:
+        # Synced banks only touch the categories that changed; banks not loaded yet pick up the files anyway.
+        for bank, categories in changed.items():
+            loader = self.registry.loaded_bank(bank)
+            if loader is not None:
+                # The sync wrote the user data copy; a loader opened on the bundled file must move over to it.
+                loader.filename = data_file_path(bank)
+                loader.reload_categories(categories)
+        self.on_banks_changed(changed)
 
-    def start_route(self, discipline: str, mode: str) -> None:
-        # Only pair is implemented right now.
-        if discipline != "pair":
-            self._set_screen(NotImplementedScreen(self, on_back=self.show_main_menu))
+    def on_banks_changed(self, changed: dict[str, set[str]]) -> None:
+        # Loaded banks have already swapped in the changed categories; let the open screen refresh.
+        for bank in changed:
+            self.registry.invalidate_indexes(bank)
+        notify = getattr(self._current_screen, "on_bank_changed", None)
+        if notify is None:
             return
+        for bank, categories in changed.items():
+            loader = self.registry.loaded_bank(bank)
+            if loader is not None:
+                notify(loader, categories)
+
+    def _preload(self) -> None:
+        self.registry.preload_async(self, self.on_bank_status)
 
-        if mode == "penalties":
-            data_file = quiz_resource_path("quiz_data/pair-skating-minus.csv")
-            loader = QuizLoader(data_file)
-            self._set_screen(PenaltiesQuizScreen(self, loader=loader, on_back=self.show_main_menu))
+    def set_language(self, language: str) -> None:
+        # Only this language's banks get loaded; the least recently used language is evicted.
+        if language == self.registry.language:
             return
+        record("language", language=language)
+        self.registry.set_language(language)
+        self.show_main_menu()
+        self.after_idle(self._preload)
+
+    def on_bank_status(self, bank: str) -> None:
+        if isinstance(self._current_screen, MainMenuScreen):
+            self._current_screen.refresh_status()
 
-        if mode == "recall":
-            data_file = recall_resource_path("quiz_data/pair-skating-plus.csv")
-            loader = RecallQuizLoader(data_file)
-            self._set_screen(RecallQuizScreen(self, loader=loader, on_back=self.show_main_menu))
+    def show_main_menu(self) -> None:
+        record("menu")
+        # Back from a quiz: a good moment to persist the statistics (a few KB, only if anything changed).
+        self.stats.save()
+        self._set_screen(MainMenuScreen(self, registry=self.registry, on_pick=self.start_route,
+                                        on_language=self.set_language, on_stats=self.show_stats))
+
+    def show_stats(self) -> None:
+        record("stats")
+        self._set_screen(StatsScreen(self, stats=self.stats, on_back=self.show_main_menu))
+
+    def start_route(self, discipline: str, mode: str) -> None:
+        record("route", discipline=discipline, mode=mode)
+        # Routes over every bank of some modes (free recall, search) come from the manifest too.
+        combined = self.registry.get_combined(mode)
+        if combined is not None:
+            self._set_screen(self.registry.create_combined_screen(combined, self, on_back=self.show_main_menu))
             return
 
-        self._set_screen(NotImplementedScreen(self, on_back=self.show_main_menu))
+        spec = self.registry.get(discipline, mode)
+        if spec is None:
+            self._set_screen(NotImplementedScreen(self, on_back=self.show_main_menu))
+            return
+
+        try:
+            screen = self.registry.create_screen(spec, self, on_back=self.show_main_menu)
+        except BankLoadError as e:
+            screen = LoadErrorScreen(self, f"{spec.label}: {e}", on_back=self.show_main_menu)
+        self._set_screen(screen)
 
 
 class MainMenuScreen(ctk.CTkFrame):
-    def __init__(self, master: ctk.CTk, on_pick):
+    def __init__(self, master: ctk.CTk, registry: DisciplineRegistry, on_pick, on_language=None, on_stats=None):
         super().__init__(master)
         self.on_pick = on_pick
+        self.registry = registry
+        # (button, base text, bank keys it needs), refreshed as the preloader reports in
+        self._route_buttons: list[tuple[ctk.CTkButton, str, list[str]]] = []
 
         ctk.CTkLabel(self, text="Choose a mode", font=("Arial", 28, "bold")).pack(pady=(35, 10))
 
+        # Language picker, only when the manifest lists more than one language
+        if on_language is not None and len(registry.languages) > 1:
+            by_label = {lang.label: lang.id for lang in registry.languages}
+            current = next((lang.label for lang in registry.languages if lang.id == registry.language), "")
+            picker = ctk.CTkSegmentedButton(self, values=list(by_label),
+                                            command=lambda label: on_language(by_label[label]))
+            picker.set(current)
+            picker.pack(pady=(0, 5))
+
         grid = ctk.CTkFrame(self, fg_color="transparent")
         grid.pack(pady=25)
 
-        def add_btn(text: str, discipline: str, mode: str, r: int, c: int, enabled: bool):
+        def add_btn(text: str, discipline: str, mode: str, r: int, c: int, banks: list[str], span: int = 1):
+            enabled = bool(banks)
             btn = ctk.CTkButton(
                 grid,
                 text=text,
@@ -83,27 +208,66 @@ class MainMenuScreen(ctk.CTkFrame):
             )
             if not enabled:
                 btn.configure(state="disabled")
-            btn.grid(row=r, column=c, padx=14, pady=12, sticky="ew")
+            btn.grid(row=r, column=c, columnspan=span, padx=14, pady=12, sticky="ew")
+            if enabled:
+                self._route_buttons.append((btn, text, banks))
 
-        # Penalties column
-        add_btn("Pair skating penalties", "pair", "penalties", 0, 0, True)
-        add_btn("Solo skating penalties", "solo", "penalties", 1, 0, False)
-        add_btn("ETC penalties",          "etc",  "penalties", 2, 0, False)
+        # One column per mode, one row per discipline (from the manifest)
+        for r, discipline in enumerate(registry.disciplines):
+            for c, mode in enumerate(registry.modes):
+                spec = registry.get(discipline.id, mode.id)
+                add_btn(f"{discipline.label} {mode.label}", discipline.id, mode.id, r, c,
+                        [registry.bank_key(spec)] if spec is not None else [])
 
-        # Recall column
-        add_btn("Pair skating recall", "pair", "recall", 0, 1, True)
-        add_btn("Solo skating recall", "solo", "recall", 1, 1, False)
-        add_btn("ETC recall",          "etc",  "recall", 2, 1, False)
+        # Then one full-width row per combined route (free recall, search over every bank)
+        span = max(1, len(registry.modes))
+        for r, combined in enumerate(registry.combined, start=len(registry.disciplines)):
+            add_btn(combined.label, "all", combined.id, r, 0, registry.combined_bank_keys(combined), span)
+
+        if on_stats is not None:
+            ctk.CTkButton(self, text="Statistics", width=220, height=40, command=on_stats).pack(pady=(0, 15))
+
+        self.error_label = ctk.CTkLabel(self, text="", font=("Arial", 13), text_color="#F44336",
+                                        justify="left", wraplength=900)
+        self.error_label.pack(pady=(0, 10))
+        self.refresh_status()
+
+    def refresh_status(self) -> None:
+        errors: dict[str, str] = {}
+        for btn, text, banks in self._route_buttons:
+            states = [self.registry.bank_status(b) for b in banks]
+            failed = [b for b, (state, _) in zip(banks, states) if state == BANK_FAILED]
+            errors.update((b, self.registry.bank_status(b)[1]) for b in failed)
+            if failed:
+                suffix = "  (failed to load)" if len(failed) == len(banks) else f"  ({len(failed)} failed)"
+            elif any(state == BANK_PENDING for state, _ in states):
+                suffix = "  (loading…)"
+            else:
+                suffix = ""
+            if btn.cget("text") != text + suffix:
+                btn.configure(text=text + suffix)
+        self.error_label.configure(text="\n".join(f"{b}: {msg}" for b, msg in sorted(errors.items())))
 
 
 class NotImplementedScreen(ctk.CTkFrame):
     def __init__(self, master: ctk.CTk, on_back):
         super().__init__(master)
         ctk.CTkLabel(self, text="Not implemented yet", font=("Arial", 26, "bold")).pack(pady=(60, 10))
-        ctk.CTkLabel(self, text="Only Pair skating is available right now.",
+        ctk.CTkLabel(self, text="There is no quiz data for this mode yet.",
                      font=("Arial", 14), text_color="gray80").pack(pady=(0, 25))
         ctk.CTkButton(self, text="Back to menu", command=on_back, width=220, height=45).pack()
 
 
+class LoadErrorScreen(ctk.CTkFrame):
+    def __init__(self, master: ctk.CTk, message: str, on_back):
+        super().__init__(master)
+        ctk.CTkLabel(self, text="Could not load quiz data", font=("Arial", 26, "bold")).pack(pady=(60, 10))
+        ctk.CTkLabel(self, text=message, font=("Arial", 14), text_color="gray80",
+                     wraplength=900).pack(pady=(0, 25))
+        ctk.CTkButton(self, text="Back to menu", command=on_back, width=220, height=45).pack()
+
+
 if __name__ == "__main__":
     SkatingApp().mainloop()
+    # A downloaded update is swapped in once the app has closed.
+    finish_pending_update()
@@ -0,0 +1,131 @@
+import csv
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Shorthand expansion for recall answers: "w/ good speed", "TO & landing", "ice cov." are
+# rewritten to "with good speed", "take-off and landing", "ice coverage" before tokenizing.
+#
+# The table is quiz_data/synonyms.csv (quiz_data/<lang>/synonyms.csv for other languages):
+#
+#     shorthand;canonical
+#     w/;with
+#     TO;take-off
+#
+# All shorthands are compiled into one Aho-Corasick automaton, so a rewrite is a single pass
+# over the text whatever the size of the table. Matching is case-insensitive unless the
+# shorthand has capitals ("TO" must be typed as "TO", so the word "to" is left alone), a
+# shorthand that starts/ends with a letter or digit only matches at a word boundary ("pos"
+# doesn't fire inside "position"), and overlapping matches resolve leftmost-longest
+# ("ice cov." wins over "cov.").
+
+SYNONYMS_FILE = "synonyms.csv"
+
+
+def _fold(text: str) -> str:
+    # Per-character lowercase, so positions in the folded text line up with the original.
+    return "".join(c if len(c.lower()) != 1 else c.lower() for c in text)
+
+
+class SynonymRewriter:
+    def __init__(self, entries: Iterable[Tuple[str, str]] = ()):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]          # ids of patterns ending at each state
+        self._patterns: List[Tuple[str, str, bool]] = []   # (shorthand, canonical, case-sensitive)
+
+        for shorthand, canonical in entries:
+            shorthand = shorthand.strip()
+            if shorthand:
+                self._add(shorthand, canonical.strip())
+        self._build_fail_links()
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def _add(self, shorthand: str, canonical: str) -> None:
+        state = 0
+        for ch in _fold(shorthand):
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(len(self._patterns))
+        self._patterns.append((shorthand, canonical, shorthand != _fold(shorthand)))
+
+    def _build_fail_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def _accept(self, text: str, start: int, end: int, pattern_id: int) -> bool:
+        shorthand, _, case_sensitive = self._patterns[pattern_id]
+        if case_sensitive and text[start:end] != shorthand:
+            return False
+        if shorthand[0].isalnum() and start > 0 and text[start - 1].isalnum():
+            return False
+        if shorthand[-1].isalnum() and end < len(text) and text[end].isalnum():
+            return False
+        return True
+
+    def rewrite(self, text: str) -> str:
+        if not self._patterns:
+            return text
+
+        # Longest accepted match per start position.
+        best: Dict[int, Tuple[int, int]] = {}
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(_fold(text)):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                end = i + 1
+                start = end - len(self._patterns[pattern_id][0])
+                if self._accept(text, start, end, pattern_id):
+                    prev = best.get(start)
+                    if prev is None or prev[0] < end:
+                        best[start] = (end, pattern_id)
+        if not best:
+            return text
+
+        parts: List[str] = []
+        pos = 0
+        for start in sorted(best):
+            if start < pos:
+                continue
+            end, pattern_id = best[start]
+            # Padded so "w/speed" still becomes two words.
+            parts.append(text[pos:start])
+            parts.append(f" {self._patterns[pattern_id][1]} ")
+            pos = end
+        parts.append(text[pos:])
+        return "".join(parts)
+
+
+def load_synonyms(path: str) -> Optional[SynonymRewriter]:
+    # None when there is no table (or nothing in it) for this language.
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            rows = list(csv.reader(f, delimiter=";"))
+    except FileNotFoundError:
+        return None
+    entries = []
+    for row in rows:
+        if len(row) < 2 or not row[0].strip() or row[0].lstrip().startswith("#"):
+            continue
+        if row[0].strip().lower() == "shorthand" and row[1].strip().lower() == "canonical":
+            continue
+        entries.append((row[0], row[1]))
+    return SynonymRewriter(entries) if entries else None
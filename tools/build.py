@@ -2,9 +2,14 @@ import shutil
 import subprocess
 import sys
 from write_version import write_version
+from build_data_pack import build_data_pack
+from build_update import build_update
 from pathlib import Path
 
 ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from discipline_registry import MANIFEST_PATH, DisciplineRegistry
 
 PYINSTALLER_ARGS = [
     "--noconsole",
@@ -22,9 +27,17 @@ def run(cmd: list[str]) -> None:
 
 def main() -> None:
     version = write_version()
-    run([sys.executable, "-m", "PyInstaller", *PYINSTALLER_ARGS])
+    # Quiz modules are imported lazily by name from the manifest, so PyInstaller can't find them on its own.
+    registry = DisciplineRegistry.from_manifest(str(ROOT / MANIFEST_PATH))
+    hidden = [arg for module in registry.modules() for arg in ("--hidden-import", module)]
+    run([sys.executable, "-m", "PyInstaller", *hidden, *PYINSTALLER_ARGS])
+    # Delta update against the previous release in dist/updates; also puts app_files.json in the zip.
+    app_dir = ROOT / "dist" / "skating_quiz"
+    if app_dir.is_dir():
+        print(f"Created: {build_update(app_dir, version)}")
     zip_path = zip_dist(app_name="skating_quiz", version=version)
     print(f"Created: {zip_path}")
+    print(f"Created: {build_data_pack()}")
 
 def zip_dist(app_name: str, version: str) -> Path:
     dist_dir = ROOT / "dist"
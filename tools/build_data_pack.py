@@ -0,0 +1,39 @@
+import json
+import shutil
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from data_pack_updater import CHUNKS_DIR, MANIFEST_FORMAT, MANIFEST_NAME, build_bank_manifest
+from discipline_registry import MANIFEST_PATH, DisciplineRegistry
+
+OUT_DIR = ROOT / "dist" / "data_pack"
+
+def build_data_pack(out_dir: Path = OUT_DIR) -> Path:
+    # Writes manifest.json + content-addressed chunks/ for every bank.
+    # Upload the folder as-is to the mirror; unchanged chunks keep their names, so only new ones need uploading.
+    if out_dir.exists():
+        shutil.rmtree(out_dir)
+    chunks_dir = out_dir / CHUNKS_DIR
+    chunks_dir.mkdir(parents=True)
+
+    manifest = {"format": MANIFEST_FORMAT, "banks": {}}
+    for bank in DisciplineRegistry.from_manifest(str(ROOT / MANIFEST_PATH)).all_data_files():
+        if not (ROOT / bank).is_file():
+            continue   # a translation only present as a synced copy on this machine
+        entry, blobs = build_bank_manifest((ROOT / bank).read_bytes())
+        manifest["banks"][bank] = entry
+        for digest, blob in blobs.items():
+            (chunks_dir / digest).write_bytes(blob)
+
+    manifest_path = out_dir / MANIFEST_NAME
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest_path
+
+def main() -> None:
+    print(f"Wrote: {build_data_pack()}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import json
+import lzma
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from app_updater import (FILES_DIR, INSTALLED_MANIFEST, LATEST_NAME, PATCHES_DIR, UPDATE_FORMAT, make_patch,
+                         sha256_hex)
+
+OUT_DIR = ROOT / "dist" / "updates"
+
+# Don't publish a patch unless it saves at least this much over the compressed full file.
+MIN_PATCH_SAVING = 0.2
+
+def _previous_release(out_dir: Path) -> dict:
+    try:
+        latest = json.loads((out_dir / LATEST_NAME).read_text(encoding="utf-8"))
+        return json.loads((out_dir / latest["manifest"]).read_text(encoding="utf-8"))
+    except (OSError, ValueError, KeyError):
+        return {"files": {}}
+
+def build_update(app_dir: Path, version: str, out_dir: Path = OUT_DIR) -> Path:
+    # Adds one release to the update mirror in out_dir: compressed files/ for contents not on the
+    # mirror yet, patches/ from the previous release's version of every changed file, and the
+    # manifest. Keep out_dir between builds (it *is* the mirror); upload it as-is, only new files
+    # need uploading. Also writes app_files.json into app_dir, so run this before zipping the app.
+    previous = _previous_release(out_dir)
+    (out_dir / FILES_DIR).mkdir(parents=True, exist_ok=True)
+    (out_dir / PATCHES_DIR).mkdir(parents=True, exist_ok=True)
+
+    files = {}
+    for path in sorted(p for p in app_dir.rglob("*") if p.is_file()):
+        rel = path.relative_to(app_dir).as_posix()
+        if rel == INSTALLED_MANIFEST:
+            continue
+        data = path.read_bytes()
+        digest = sha256_hex(data)
+        blob_path = out_dir / FILES_DIR / digest
+        if not blob_path.exists():
+            blob_path.write_bytes(lzma.compress(data))
+        entry = {"sha256": digest, "size": len(data), "blob_size": blob_path.stat().st_size, "patches": {}}
+
+        old_digest = previous["files"].get(rel, {}).get("sha256")
+        if old_digest is not None and old_digest != digest:
+            patch_path = out_dir / PATCHES_DIR / f"{old_digest}-{digest}"
+            if not patch_path.exists():
+                old = lzma.decompress((out_dir / FILES_DIR / old_digest).read_bytes())
+                patch = make_patch(old, data)
+                if len(patch) <= (1 - MIN_PATCH_SAVING) * entry["blob_size"]:
+                    patch_path.write_bytes(patch)
+            if patch_path.exists():
+                entry["patches"][old_digest] = {"size": patch_path.stat().st_size}
+        files[rel] = entry
+
+    manifest = {"format": UPDATE_FORMAT, "version": version, "files": files}
+    manifest_text = json.dumps(manifest, indent=2)
+    manifest_rel = f"{version}/manifest.json"
+    (out_dir / version).mkdir(parents=True, exist_ok=True)
+    (out_dir / manifest_rel).write_text(manifest_text, encoding="utf-8")
+    (app_dir / INSTALLED_MANIFEST).write_text(manifest_text, encoding="utf-8")
+    latest = {"format": UPDATE_FORMAT, "version": version, "manifest": manifest_rel}
+    (out_dir / LATEST_NAME).write_text(json.dumps(latest, indent=2), encoding="utf-8")
+
+    changed = [e for rel, e in files.items() if previous["files"].get(rel, {}).get("sha256") != e["sha256"]]
+    full = sum(e["blob_size"] for e in files.values())
+    delta = sum(min([e["blob_size"], *(p["size"] for p in e["patches"].values())]) for e in changed)
+    print(f"{version}: {len(changed)} of {len(files)} files changed, "
+          f"update download {delta / 1024:.0f} KiB (full app {full / 1024 / 1024:.1f} MiB compressed)")
+    return out_dir / manifest_rel
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("app_dir", help="the PyInstaller output folder, e.g. dist/skating_quiz")
+    parser.add_argument("version")
+    parser.add_argument("--out", default=str(OUT_DIR))
+    args = parser.parse_args()
+    print(f"Wrote: {build_update(Path(args.app_dir), args.version, Path(args.out))}")
+
+if __name__ == "__main__":
+    main()
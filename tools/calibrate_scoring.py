@@ -0,0 +1,211 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from quiz_goe_plus_bullets import (
+    DEFAULT_SCORING,
+    RecallQuizLoader,
+    ScoringConfig,
+    _components,
+    assignment_from_components,
+    grade_against_sets,
+)
+
+# Calibrates the recall grading constants (ScoringConfig) against a labelled corpus.
+#
+# Corpus: semicolon-separated, UTF-8, with a header row:
+#     attempt;category;set;slot;user_answer;intended;verdict
+#   attempt  - any id; rows with the same id are one recall attempt (up to 6 rows)
+#   category - recall category, as in the bank CSV
+#   set      - label of the set the attempt was judged against, as in the bank CSV (optional;
+#              column may be left out). Without it, a category with several sets is graded
+#              against the set the app would pick with the current defaults.
+#   slot     - row the answer was typed into (1..6)
+#   intended - bullet number the user meant (1..6), empty if none
+#   verdict  - "match" if a judge would accept the answer as that bullet, otherwise "no_match"
+#
+# The string comparisons (similarity_components) are computed once per attempt; every candidate
+# config then only re-blends and re-assigns, in parallel across a process pool.
+#
+#     python tools/calibrate_scoring.py corpus.csv --random 2000
+#     python tools/calibrate_scoring.py corpus.csv --grid 4 --workers 8
+
+DEFAULT_BANK = "quiz_data/pair-skating-plus.csv"
+
+# (low, high) per tuned field. token_weight is always 1 - char_weight.
+SEARCH_SPACE = {
+    "char_weight": (0.4, 0.9),
+    "group_penalty": (0.0, 0.3),
+    "pos_penalty": (0.0, 0.15),
+    "weak_cutoff": (0.3, 0.6),
+    "weak_factor": (0.0, 0.5),
+    "match_threshold": (0.4, 0.7),
+}
+
+@dataclass
+class LabelledRow:
+    slot: int               # 0..5
+    intended: int | None    # 0..5
+    is_match: bool
+    blank: bool
+
+@dataclass
+class Metrics:
+    accuracy: float
+    precision: float
+    recall: float
+    f1: float
+    tp: int
+    fp: int
+    tn: int
+    fn: int
+
+def load_corpus(corpus_path: str, bank_path: str) -> list[tuple[list[str], list[str], list[LabelledRow]]]:
+    # Returns [(user_texts[6], correct_texts[6], rows), ...], one entry per attempt.
+    loader = RecallQuizLoader(bank_path)
+    attempts: dict[str, tuple[str, str, list[str], list[LabelledRow]]] = {}
+    with open(corpus_path, encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f, delimiter=";")
+        for rec in reader:
+            category = rec["category"].strip()
+            set_label = (rec.get("set") or "").strip()
+            slot = int(rec["slot"]) - 1
+            intended = rec["intended"].strip()
+            text = rec["user_answer"].strip()
+            key = rec["attempt"].strip()
+
+            cat, label, texts, rows = attempts.setdefault(key, (category, set_label, [""] * 6, []))
+            if (cat, label) != (category, set_label):
+                raise ValueError(f"Attempt '{key}' mixes sets '{cat}/{label}' and '{category}/{set_label}'")
+            texts[slot] = text
+            rows.append(LabelledRow(
+                slot=slot,
+                intended=int(intended) - 1 if intended else None,
+                is_match=rec["verdict"].strip().lower() == "match",
+                blank=not text,
+            ))
+
+    out = []
+    for key, (category, set_label, texts, rows) in attempts.items():
+        sets = loader.get_sets_for_category(category)
+        if not sets:
+            raise ValueError(f"Attempt '{key}': unknown category '{category}'")
+        if set_label:
+            item_set = next((s for s in sets if s.label == set_label), None)
+            if item_set is None:
+                raise ValueError(f"Attempt '{key}': category '{category}' has no set '{set_label}'")
+        else:
+            item_set = grade_against_sets(texts, sets).item_set
+        out.append((texts, item_set.descriptions, rows))
+    return out
+
+# --- worker side ---
+
+_ATTEMPTS: list = []
+
+def _init_worker(attempts) -> None:
+    global _ATTEMPTS
+    _ATTEMPTS = attempts
+
+def _attempt_components(pair: tuple[list[str], list[str]]):
+    return _components(*pair)
+
+def evaluate(config: ScoringConfig, attempts=None) -> Metrics:
+    tp = fp = tn = fn = 0
+    for components, rows in (attempts if attempts is not None else _ATTEMPTS):
+        matches = assignment_from_components(components, config)
+        for row in rows:
+            m = matches[row.slot]
+            predicted = (not row.blank and m.sim >= config.match_threshold
+                         and row.intended is not None and m.matched_correct == row.intended)
+            if predicted and row.is_match:
+                tp += 1
+            elif predicted:
+                fp += 1
+            elif row.is_match:
+                fn += 1
+            else:
+                tn += 1
+    total = tp + fp + tn + fn
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return Metrics(accuracy=(tp + tn) / total if total else 0.0,
+                   precision=precision, recall=recall, f1=f1, tp=tp, fp=fp, tn=tn, fn=fn)
+
+# --- search space ---
+
+def make_config(**values: float) -> ScoringConfig:
+    cw = values.pop("char_weight", DEFAULT_SCORING.char_weight)
+    return ScoringConfig(char_weight=cw, token_weight=1.0 - cw, **values)
+
+def grid_configs(steps: int) -> list[ScoringConfig]:
+    axes = []
+    for name, (lo, hi) in SEARCH_SPACE.items():
+        vals = [lo + (hi - lo) * k / (steps - 1) for k in range(steps)] if steps > 1 else [lo]
+        axes.append([(name, round(v, 4)) for v in vals])
+    return [make_config(**dict(combo)) for combo in itertools.product(*axes)]
+
+def random_configs(n: int, seed: int) -> list[ScoringConfig]:
+    rng = random.Random(seed)
+    return [make_config(**{name: round(rng.uniform(lo, hi), 4) for name, (lo, hi) in SEARCH_SPACE.items()})
+            for _ in range(n)]
+
+def format_metrics(m: Metrics) -> str:
+    return (f"acc {m.accuracy:.3f}  prec {m.precision:.3f}  rec {m.recall:.3f}  f1 {m.f1:.3f}  "
+            f"(tp {m.tp}, fp {m.fp}, tn {m.tn}, fn {m.fn})")
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus")
+    parser.add_argument("--bank", default=str(ROOT / DEFAULT_BANK))
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--grid", type=int, metavar="STEPS", help="grid search with STEPS values per parameter")
+    mode.add_argument("--random", type=int, metavar="N", default=1000, help="random search over N configs")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--out", help="write the ranked results as JSON")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus, args.bank)
+    configs = grid_configs(args.grid) if args.grid else random_configs(args.random, args.seed)
+    print(f"{len(corpus)} attempts, {sum(len(r) for _, _, r in corpus)} labelled rows, {len(configs)} configs")
+
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        components = list(pool.map(_attempt_components, [(u, c) for u, c, _ in corpus], chunksize=16))
+    attempts = [(comp, rows) for comp, (_, _, rows) in zip(components, corpus)]
+    t1 = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(attempts,)) as pool:
+        chunksize = max(1, len(configs) // (4 * (args.workers or 1)))
+        metrics = list(pool.map(evaluate, configs, chunksize=chunksize))
+    t2 = time.perf_counter()
+    print(f"Precompute {t1 - t0:.1f}s, search {t2 - t1:.1f}s")
+
+    print(f"\nCurrent defaults: {format_metrics(evaluate(DEFAULT_SCORING, attempts))}\n")
+
+    ranked = sorted(zip(configs, metrics), key=lambda cm: (-cm[1].accuracy, -cm[1].f1))
+    for config, m in ranked[:args.top]:
+        print(format_metrics(m))
+        print("    " + ", ".join(f"{k}={v:.4f}" for k, v in asdict(config).items()))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump([{"config": asdict(c), "metrics": asdict(m)} for c, m in ranked], f, indent=2)
+        print(f"\nWrote: {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from data_pack_updater import CHUNKS_DIR, MANIFEST_FORMAT, MANIFEST_NAME, DataPackUpdater, build_bank_manifest
+
+# Round-trips banks through a data pack mirror (a temp folder, read over file://) and checks that
+# the synced file is byte-identical, that a second sync is a no-op, and that an edit reports just
+# the edited category. The banks have their categories interleaved on purpose: the chunking must
+# not depend on a category's lines being contiguous.
+#
+#     python tools/check_data_pack.py
+
+BANK = "quiz_data/check.csv"
+
+HEADER = b"Element Category;Error Description;Penalty Points\r\n"
+INTERLEAVED = HEADER + (
+    b"LIFTS;Fall;-5\r\n"
+    b"JUMPS;Fall;-5\r\n"
+    b"LIFTS;Serious problems in the lifting process;-3\r\n"
+    b"SPINS;Fall;-5\r\n"
+    b"JUMPS;Two-footed landing;-1 to -2\r\n"
+    b"LIFTS;Slight problems in the lifting process;-1 to -2\r\n"
+)
+EDITED = INTERLEAVED.replace(b"JUMPS;Two-footed landing;-1 to -2", b"JUMPS;Two-footed landing;-1 to -3")
+
+
+def publish(mirror: Path, data: bytes) -> None:
+    entry, blobs = build_bank_manifest(data)
+    (mirror / CHUNKS_DIR).mkdir(parents=True, exist_ok=True)
+    for digest, blob in blobs.items():
+        (mirror / CHUNKS_DIR / digest).write_bytes(blob)
+    manifest = {"format": MANIFEST_FORMAT, "banks": {BANK: entry}}
+    (mirror / MANIFEST_NAME).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+
+def main() -> int:
+    failures = []
+
+    def check(name: str, ok: bool, detail: str = "") -> None:
+        print(f"{'ok  ' if ok else 'FAIL'} {name}{f': {detail}' if detail and not ok else ''}")
+        if not ok:
+            failures.append(name)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        mirror, data_dir = Path(tmp) / "mirror", Path(tmp) / "data"
+        synced = data_dir / BANK
+
+        def sync(into: Path = data_dir) -> dict:
+            return DataPackUpdater(mirror.as_uri() + "/", [BANK], data_dir=into).sync()
+
+        publish(mirror, INTERLEAVED)
+        # A copy that already matches the mirror (e.g. the bundled bank) must not be re-synced.
+        current = Path(tmp) / "current"
+        (current / BANK).parent.mkdir(parents=True)
+        (current / BANK).write_bytes(INTERLEAVED)
+        changed = sync(current)
+        check("bank identical to the mirror is not synced", changed == {}, str(changed))
+
+        changed = sync()
+        check("first sync writes the bank", synced.is_file() and synced.read_bytes() == INTERLEAVED)
+        check("first sync reports every category", changed == {BANK: {"Element Category", "LIFTS", "JUMPS", "SPINS"}},
+              str(changed))
+        changed = sync()
+        check("unchanged bank is not synced again", changed == {}, str(changed))
+
+        publish(mirror, EDITED)
+        changed = sync()
+        check("edited bank is byte-identical", synced.read_bytes() == EDITED)
+        check("only the edited category is reported", changed == {BANK: {"JUMPS"}}, str(changed))
+        check("edited bank is not synced again", sync() == {})
+
+    print("FAIL" if failures else "PASS")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
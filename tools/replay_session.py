@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.chdir(ROOT)
+
+from session_recorder import load_session
+
+# Replays a recorded UI session (SKATING_QUIZ_RECORD=<path> / --record <path>) against SkatingApp
+# and times every step, including the redraw it causes. On machines without a display an Xvfb
+# virtual framebuffer is started automatically.
+#
+#     python tools/replay_session.py session.jsonl --repeat 5 --out report.json
+#     python tools/replay_session.py session.jsonl --compare report.json   # exit 1 on regression
+
+# Ignore differences below this when comparing reports (timer/scheduler noise).
+NOISE_FLOOR_MS = 2.0
+
+def start_xvfb() -> subprocess.Popen | None:
+    if os.name != "posix" or os.environ.get("DISPLAY"):
+        return None
+    if shutil.which("Xvfb") is None:
+        raise RuntimeError("No DISPLAY and Xvfb is not installed")
+    for n in range(99, 200):
+        if os.path.exists(f"/tmp/.X{n}-lock"):
+            continue
+        proc = subprocess.Popen(["Xvfb", f":{n}", "-screen", "0", "1920x1200x24", "-nolisten", "tcp"],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):
+            if os.path.exists(f"/tmp/.X11-unix/X{n}"):
+                os.environ["DISPLAY"] = f":{n}"
+                return proc
+            time.sleep(0.1)
+        proc.terminate()
+    raise RuntimeError("Could not start Xvfb")
+
+# How long to wait for the background bank preload before giving up.
+PRELOAD_TIMEOUT_S = 60.0
+
+def wait_for_preload(app) -> None:
+    # The app preloads its banks in the background; timed steps shouldn't race against that.
+    deadline = time.perf_counter() + PRELOAD_TIMEOUT_S
+    while app.registry.pending_banks():
+        if time.perf_counter() > deadline:
+            raise RuntimeError(f"Banks still loading after {PRELOAD_TIMEOUT_S:.0f} s: {app.registry.pending_banks()}")
+        app.update()
+        time.sleep(0.01)
+
+def _set_entry(entry, text: str) -> None:
+    entry.delete(0, "end")
+    if text:
+        entry.insert(0, text)
+
+def apply_event(app, event: dict) -> bool:
+    # Performs one recorded action. Returns False for events that aren't UI actions.
+    action = event["action"]
+    screen = app._current_screen
+
+    if action == "menu":
+        app.show_main_menu()
+    elif action == "stats":
+        app.show_stats()
+    elif action == "language":
+        app.set_language(event["language"])
+    elif action == "route":
+        app.start_route(event["discipline"], event["mode"])
+    elif action == "categories":
+        screen.back_to_categories()
+    elif action == "category":
+        if "seed" in event:
+            screen.start_quiz(event["category"], seed=event["seed"])
+        else:
+            screen.start_quiz(event["category"], set_index=event.get("set_index"))
+    elif action == "exam":
+        screen.start_exam(event["count"], event["seed"])
+    elif action == "answer":
+        screen.handle_press(event["choice"])
+        # The feedback delay is idle time, not work: go straight to the next question.
+        if getattr(screen, "_pending_next", None) is not None:
+            screen.advance_now()
+    elif action == "recall_check":
+        for entry, text in zip(screen.entries, event["entries"]):
+            _set_entry(entry, text)
+        screen.on_check()
+    elif action == "free_recall_check":
+        screen.input_box.delete("1.0", "end")
+        screen.input_box.insert("1.0", event["text"])
+        screen.on_check()
+    elif action == "search":
+        _set_entry(screen.entry, event["query"])
+        screen.refresh()
+    else:
+        return False
+    return True
+
+def replay_once(events: list[dict], realtime: bool = False) -> list[dict]:
+    from skating_quiz import SkatingApp
+
+    app = SkatingApp(diagnostics=False, check_updates=False, record_path="", stats_path="")
+    app.update()
+    wait_for_preload(app)
+    steps = []
+    prev_t = 0.0
+    try:
+        for i, event in enumerate(events):
+            if realtime:
+                time.sleep(max(0.0, event.get("t", prev_t) - prev_t))
+            prev_t = event.get("t", prev_t)
+
+            t0 = time.perf_counter()
+            if not apply_event(app, event):
+                continue
+            app.update()
+            ms = (time.perf_counter() - t0) * 1000
+            steps.append({"i": i, "action": event["action"], "ms": round(ms, 3)})
+            if event["action"] == "language":
+                wait_for_preload(app)   # the new language's banks load in the background, untimed
+    finally:
+        app.destroy()
+    return steps
+
+def summarize(runs: list[list[dict]]) -> dict:
+    by_action: dict[str, list[float]] = {}
+    for steps in runs:
+        for step in steps:
+            by_action.setdefault(step["action"], []).append(step["ms"])
+
+    summary = {}
+    for action, values in sorted(by_action.items()):
+        values.sort()
+        summary[action] = {
+            "count": len(values),
+            "mean_ms": round(statistics.fmean(values), 3),
+            "p50_ms": round(values[len(values) // 2], 3),
+            "p95_ms": round(values[min(len(values) - 1, int(len(values) * 0.95))], 3),
+            "max_ms": round(values[-1], 3),
+        }
+    return summary
+
+def median_steps(runs: list[list[dict]]) -> list[dict]:
+    # Per step, the median over repeated runs (steps line up: the same session is replayed).
+    out = []
+    for per_run in zip(*runs):
+        out.append({"i": per_run[0]["i"], "action": per_run[0]["action"],
+                    "ms": round(statistics.median(s["ms"] for s in per_run), 3)})
+    return out
+
+def compare(report: dict, baseline: dict, threshold_pct: float) -> list[str]:
+    regressions = []
+    for action, cur in report["summary"].items():
+        base = baseline.get("summary", {}).get(action)
+        if not base:
+            continue
+        delta = cur["p50_ms"] - base["p50_ms"]
+        pct = 100.0 * delta / base["p50_ms"] if base["p50_ms"] else 0.0
+        line = f"{action:<20} p50 {base['p50_ms']:>9.2f} -> {cur['p50_ms']:>9.2f} ms ({pct:+.0f}%)"
+        print(line)
+        if delta > NOISE_FLOOR_MS and pct > threshold_pct:
+            regressions.append(line)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("session")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--realtime", action="store_true", help="keep the recorded gaps between actions")
+    parser.add_argument("--out", help="write the timing report as JSON")
+    parser.add_argument("--compare", metavar="REPORT", help="baseline report to compare against")
+    parser.add_argument("--threshold", type=float, default=20.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    events = load_session(args.session)
+    xvfb = start_xvfb()
+    try:
+        runs = [replay_once(events[1:], realtime=args.realtime) for _ in range(max(1, args.repeat))]
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    report = {
+        "session": os.path.abspath(args.session),
+        "recorded_version": events[0].get("version"),
+        "repeat": len(runs),
+        "total_ms": round(statistics.median(sum(s["ms"] for s in steps) for steps in runs), 3),
+        "summary": summarize(runs),
+        "steps": median_steps(runs),
+    }
+
+    print(f"{len(report['steps'])} steps, total {report['total_ms']:.1f} ms (median of {len(runs)} runs)")
+    for action, s in report["summary"].items():
+        print(f"{action:<20} n={s['count']:<5} p50 {s['p50_ms']:>9.2f}  p95 {s['p95_ms']:>9.2f}  "
+              f"max {s['max_ms']:>9.2f} ms")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote: {args.out}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared to {args.compare}:")
+        regressions = compare(report, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION: {r}")
+        return 1 if regressions else 0
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
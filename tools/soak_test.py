@@ -0,0 +1,141 @@
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from diagnostics import LeakTracker
+from discipline_registry import BANK_FAILED
+from skating_quiz import SkatingApp
+
+# Soak scenario: cycles every route many times and asserts memory and widget counts stay bounded.
+# Needs a display (use xvfb-run on headless machines):
+#     xvfb-run python tools/soak_test.py --cycles 200
+
+WARMUP_CYCLES = 10
+# Keep the tracker's own history small, so it's already full (constant size) after warm-up.
+MAX_SAMPLES = 50
+MAX_WIDGET_GROWTH = 0
+MAX_BYTES_PER_CYCLE = 4 * 1024
+
+def run_penalties(app: SkatingApp) -> None:
+    app.start_route("pair", "penalties")
+    screen = app._current_screen
+    app.update()
+    for cat in screen.loader.get_categories():
+        screen.start_quiz(cat)
+        app.update()
+        while screen.engine.get_current_question() is not None:
+            q = screen.engine.get_current_question()
+            wrong = next((a for a in screen.possible_answers if a != q['answer']), None)
+            if wrong is not None:
+                screen.handle_press(wrong)
+            # update() runs the idle pre-build of the next question; advance_now() swaps it in
+            # without waiting out the feedback delay.
+            screen.handle_press(q['answer'])
+            app.update()
+            screen.advance_now()
+            app.update()
+        screen.setup_category_selection()
+        app.update()
+
+def run_recall(app: SkatingApp) -> None:
+    app.start_route("pair", "recall")
+    screen = app._current_screen
+    app.update()
+    for cat in screen.loader.get_categories():
+        screen.start_quiz(cat)
+        for ent, desc in zip(screen.entries, reversed(screen.current_set.descriptions)):
+            ent.insert(0, desc)
+        screen.on_check()
+        screen.on_check()
+        app.update()
+        screen.setup_category_selection()
+        app.update()
+
+def run_free_recall(app: SkatingApp) -> None:
+    app.start_route("all", "free_recall")
+    screen = app._current_screen
+    screen.input_box.insert("1.0", "clean catch\nvery good unison\noneness\n")
+    screen.on_check()
+    app.update()
+
+def run_search(app: SkatingApp) -> None:
+    app.start_route("all", "search")
+    screen = app._current_screen
+    for query in ("l", "lift", "fall on", ""):
+        screen.entry.delete(0, "end")
+        screen.entry.insert(0, query)
+        screen.refresh()
+        app.update()
+
+def load_banks(app: SkatingApp) -> list[str]:
+    # Waits for the background preload; returns the banks that failed (the soak would be meaningless).
+    while app.registry.pending_banks():
+        app.update()
+        time.sleep(0.01)
+    return [f"{bank}: {msg}" for bank in app.registry.all_data_files()
+            for state, msg in [app.registry.bank_status(bank)] if state == BANK_FAILED]
+
+def cycle(app: SkatingApp) -> None:
+    run_penalties(app)
+    app.show_main_menu()
+    run_recall(app)
+    app.show_main_menu()
+    run_free_recall(app)
+    app.show_main_menu()
+    run_search(app)
+    app.show_main_menu()
+    app.show_stats()
+    app.update()
+    app.show_main_menu()
+    app.update()
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cycles", type=int, default=50)
+    args = parser.parse_args()
+
+    app = SkatingApp(diagnostics=False, check_updates=False, stats_path="")
+    app.withdraw()
+    # Our own tracker rather than the app's, for the smaller history; the app samples it on every screen change.
+    tracker = app.leak_tracker = LeakTracker(app, max_samples=MAX_SAMPLES)
+    tracker.start()
+    failed = load_banks(app)
+    if failed:
+        for f in failed:
+            print(f"FAIL: bank did not load: {f}")
+        app.destroy()
+        return 1
+
+    for _ in range(WARMUP_CYCLES):
+        cycle(app)
+    baseline = tracker.sample("baseline")
+
+    for i in range(args.cycles):
+        cycle(app)
+        tracker.on_transition("cycle")
+    final = tracker.sample("final")
+
+    print(tracker.summary())
+    app.destroy()
+
+    failures = []
+    widget_growth = final.widget_count - baseline.widget_count
+    if widget_growth > MAX_WIDGET_GROWTH:
+        failures.append(f"Tk widgets grew by {widget_growth} over {args.cycles} cycles")
+    per_cycle = (final.traced_bytes - baseline.traced_bytes) / max(1, args.cycles)
+    if per_cycle > MAX_BYTES_PER_CYCLE:
+        failures.append(f"Traced memory grew {per_cycle / 1024:.1f} KiB per cycle")
+    failures.extend(tracker.warnings)
+
+    for f in failures:
+        print(f"FAIL: {f}")
+    if not failures:
+        print("OK: memory and widget counts bounded")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
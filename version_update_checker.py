@@ -6,7 +6,8 @@ import threading
 import webbrowser
 from urllib.request import Request, urlopen
 
-import customtkinter as ctk
+# The GUI toolkit is imported by the window function only: the data and app updaters import
+# _parse_semantic_version from here before the app is up (see app_updater.finish_pending_update).
 
 def check_and_prompt_update_async(root, owner: str, repo: str, current_version: str, delay_ms: int = 200) -> None:
     # Starts a background thread to check for updates - prompt user if update is available.
@@ -80,6 +81,7 @@ def _show_non_blocking_update_window(root, owner: str, repo: str, current_versio
     except Exception:
         pass
 
+    import customtkinter as ctk
     win = ctk.CTkToplevel(root)
     root._update_window = win  # type: ignore[attr-defined]
 
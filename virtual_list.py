@@ -0,0 +1,146 @@
+import customtkinter as ctk
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# Virtualized button list.
+#
+# Replaces "one CTkButton per category inside a CTkScrollableFrame": only the rows that fit in
+# the view are ever created, and scrolling just re-labels that fixed pool of buttons. Building
+# the list costs the same for 7 categories or 7000.
+
+
+class VirtualList(ctk.CTkFrame):
+    def __init__(self, master, items: Sequence[Tuple[str, str]], on_pick: Callable[[str], None],
+                 width: int = 500, height: int = 400, row_height: int = 40, row_pady: int = 5,
+                 show_filter: bool = True, filter_placeholder: str = "Filter..."):
+        # items: (label, value) pairs; on_pick(value) is called when a row is clicked.
+        super().__init__(master, width=width)
+        self.on_pick = on_pick
+        self.row_height = row_height
+        self.row_pady = row_pady
+
+        self._items: List[Tuple[str, str]] = list(items)
+        self._lower_labels: List[str] = [label.lower() for label, _ in self._items]
+        self._visible: List[int] = list(range(len(self._items)))   # indices into _items
+        self._filter_text = ""
+        self._offset = 0
+
+        self.filter_entry: Optional[ctk.CTkEntry] = None
+        if show_filter:
+            self.filter_entry = ctk.CTkEntry(self, placeholder_text=filter_placeholder, height=32)
+            self.filter_entry.pack(fill="x", padx=20, pady=(10, 5))
+            self.filter_entry.bind("<KeyRelease>", lambda _e: self.set_filter(self.filter_entry.get()))
+
+        body = ctk.CTkFrame(self, fg_color="transparent", width=width, height=height)
+        body.pack(fill="both", expand=True)
+        body.pack_propagate(False)
+
+        self.scrollbar = ctk.CTkScrollbar(body, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.rows_frame = ctk.CTkFrame(body, fg_color="transparent")
+        self.rows_frame.pack(side="left", fill="both", expand=True)
+
+        # Fixed pool: as many buttons as fit in the viewport.
+        self.page_size = max(1, height // (row_height + 2 * row_pady))
+        self._row_values: List[Optional[str]] = [None] * self.page_size
+        self._packed: List[bool] = [False] * self.page_size
+        self._buttons: List[ctk.CTkButton] = []
+        for slot in range(self.page_size):
+            btn = ctk.CTkButton(self.rows_frame, text="", height=row_height,
+                                command=lambda s=slot: self._on_row_click(s))
+            self._buttons.append(btn)
+            self._bind_wheel(btn)
+        self._bind_wheel(self.rows_frame)
+
+        self._render()
+
+    # --- data ---
+
+    def set_items(self, items: Sequence[Tuple[str, str]]) -> None:
+        self._items = list(items)
+        self._lower_labels = [label.lower() for label, _ in self._items]
+        text, self._filter_text = self._filter_text, None  # force a full re-filter
+        self.set_filter(text or "")
+
+    def set_filter(self, text: str) -> None:
+        # Case-insensitive substring filter. Narrowing the previous filter ("de" -> "dea") only
+        # rescans the rows that are currently visible.
+        text = text.strip().lower()
+        if text == self._filter_text:
+            return
+        if self._filter_text and text.startswith(self._filter_text):
+            candidates = self._visible
+        else:
+            candidates = range(len(self._items))
+        self._visible = [i for i in candidates if text in self._lower_labels[i]] if text else list(candidates)
+        self._filter_text = text
+        self._offset = 0
+        self._render()
+
+    def visible_count(self) -> int:
+        return len(self._visible)
+
+    # --- scrolling ---
+
+    def _max_offset(self) -> int:
+        return max(0, len(self._visible) - self.page_size)
+
+    def scroll_to(self, offset: int) -> None:
+        offset = min(max(0, offset), self._max_offset())
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, *args) -> None:
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(round(float(args[1]) * len(self._visible)))
+        elif args[0] == "scroll":
+            step = int(args[1]) * (self.page_size if args[2] == "pages" else 1)
+            self.scroll_to(self._offset + step)
+
+    def _bind_wheel(self, widget) -> None:
+        widget.bind("<MouseWheel>", self._on_wheel, add="+")
+        widget.bind("<Button-4>", lambda _e: self.scroll_to(self._offset - 1), add="+")
+        widget.bind("<Button-5>", lambda _e: self.scroll_to(self._offset + 1), add="+")
+        try:
+            for child in widget.winfo_children():
+                child.bind("<MouseWheel>", self._on_wheel, add="+")
+        except Exception:
+            pass
+
+    def _on_wheel(self, event) -> None:
+        # Windows reports multiples of 120, macOS small deltas.
+        if not event.delta:
+            return
+        steps = max(1, abs(event.delta) // 120)
+        self.scroll_to(self._offset + (-steps if event.delta > 0 else steps))
+
+    # --- rendering ---
+
+    def _render(self) -> None:
+        for slot, btn in enumerate(self._buttons):
+            pos = self._offset + slot
+            if pos < len(self._visible):
+                label, value = self._items[self._visible[pos]]
+                self._row_values[slot] = value
+                btn.configure(text=label)
+                if not self._packed[slot]:
+                    btn.pack(pady=self.row_pady, fill="x", padx=20)
+                    self._packed[slot] = True
+            elif self._packed[slot]:
+                self._row_values[slot] = None
+                btn.pack_forget()
+                self._packed[slot] = False
+
+        total = len(self._visible)
+        if total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self._offset / total, (self._offset + self.page_size) / total)
+
+    def _on_row_click(self, slot: int) -> None:
+        value = self._row_values[slot]
+        if value is not None:
+            self.on_pick(value)